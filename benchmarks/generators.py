@@ -0,0 +1,309 @@
+"""Synthetic "Plex Media Server.log" and websocket notification generators (used by the benchmarks)."""
+import json
+import random
+import time
+
+TIME_FORMAT = '%b %d, %Y %H:%M:%S'
+
+NOISE = [
+    'Request: [{address}:{port}] GET /library/sections (12 live) GZIP Signed-in Token (admin)',
+    'Completed: [{address}:{port}] 200 GET /library/sections (12 live) GZIP 3ms 1234 bytes (pipelined: 1)',
+    'Auth: We found auth token (xxxxxxxx), enabling token-based authentication.',
+    'Auth: Refreshing tokens inside the token-based authentication filter.',
+    'Comparing request from {address} with allowed networks',
+    'Request: [{address}:{port}] GET /video/:/transcode/universal/ping?session=abc123 (12 live) GZIP',
+    'Received transcode session ping for session abc123.',
+    '[Now] Updated play state for /library/metadata/{rating_key}.',
+    'Statistics: (abcdef) Reporting active playback in state 1 of type 1 (scrobble: 0) for account 1',
+    'Play progress on {rating_key} \'Episode {rating_key}\' - got played {time} ms by account 1!',
+    'Scanner: Processing directory /media/tv/Show {rating_key}'
+]
+
+STATES = ['playing', 'playing', 'playing', 'paused', 'buffering', 'stopped']
+
+TIMELINE_STATES = [0, 2, 3, 4, 5, 6, 9]
+
+
+class Session(object):
+    def __init__(self, rnd, index):
+        self.index = index
+
+        self.address = '192.168.1.%d' % (10 + index % 200)
+        self.port = rnd.randint(40000, 60000)
+
+        self.thread = '0x7f%010x' % rnd.getrandbits(40)
+        self.machine_identifier = 'client-%04d' % index
+
+        self.rating_key = rnd.randint(1000, 99999)
+        self.duration = rnd.randint(20, 150) * 60 * 1000
+
+        self.time = 0
+        self.state = 'playing'
+
+
+class LogGenerator(object):
+    """Generates PMS log lines (timeline/progress request blocks, parameter lines, ignored noise and
+    scrobble lines) for a number of concurrent playback sessions.
+
+    :param sessions: Number of concurrent playback sessions
+    :param noise: Number of noise lines written between request blocks (on average)
+    :param scrobble_rate: Fraction of blocks followed by a scrobble line
+    :param interleave: Interleave the lines of concurrent request blocks (like a busy server)
+    """
+
+    def __init__(self, sessions=10, noise=4, scrobble_rate=0.05, interleave=True, seed=None):
+        self.rnd = random.Random(seed)
+
+        self.sessions = [Session(self.rnd, x) for x in range(sessions)]
+
+        self.noise = noise
+        self.scrobble_rate = scrobble_rate
+        self.interleave = interleave
+
+        self.timestamp = time.time()
+
+    def header(self, thread):
+        self.timestamp += 0.001
+
+        return '%s.%03d [%s] DEBUG - ' % (
+            time.strftime(TIME_FORMAT, time.localtime(self.timestamp)),
+            int(self.timestamp * 1000) % 1000,
+            thread
+        )
+
+    def block(self, session):
+        """Generate a request block for :code:`session`
+
+        :rtype: list of (thread, message)
+        """
+        session.time = min(session.time + 10000, session.duration)
+        session.state = self.rnd.choice(STATES)
+
+        if self.rnd.random() < 0.5:
+            return [
+                (session.thread, 'Request: [%s:%s] GET /:/timeline?ratingKey=%s&key=%%2Flibrary%%2Fmetadata%%2F%s'
+                                 '&state=%s&time=%s&duration=%s (12 live) GZIP Signed-in Token (admin)' % (
+                                     session.address, session.port, session.rating_key, session.rating_key,
+                                     session.state, session.time, session.duration
+                                 )),
+                (session.thread, ' * identifier => com.plexapp.plugins.library'),
+                (session.thread, 'Client [%s] reporting timeline state %s, progress of %s/%sms for guid=, '
+                                 'ratingKey=%s url=, key=/library/metadata/%s, containerKey=, metadataId=%s' % (
+                                     session.machine_identifier, session.state, session.time, session.duration,
+                                     session.rating_key, session.rating_key, session.rating_key
+                                 )),
+                (session.thread, '[Now] User is admin (ID: 1)'),
+                (session.thread, '[Now] Device is Plex Web (Chrome).'),
+                (session.thread, 'Completed: [%s:%s] 200 GET /:/timeline (12 live) GZIP 5ms 382 bytes' % (
+                    session.address, session.port
+                ))
+            ]
+
+        return [
+            (session.thread, 'Request: [%s:%s] GET /:/progress?key=%s&identifier=com.plexapp.plugins.library'
+                             '&time=%s&state=%s (12 live) GZIP Signed-in Token (admin)' % (
+                                 session.address, session.port, session.rating_key, session.time, session.state
+                             )),
+            (session.thread, ' * key => %s' % session.rating_key),
+            (session.thread, ' * time => %s' % session.time),
+            (session.thread, ' * state => %s' % session.state),
+            (session.thread, 'Completed: [%s:%s] 200 GET /:/progress (12 live) GZIP 2ms 382 bytes' % (
+                session.address, session.port
+            ))
+        ]
+
+    def noise_lines(self, session):
+        count = self.rnd.randint(0, self.noise * 2)
+
+        return [
+            ('0x7f%010x' % self.rnd.getrandbits(40), self.rnd.choice(NOISE).format(
+                address=session.address, port=session.port,
+                rating_key=session.rating_key, time=session.time
+            ))
+            for _ in range(count)
+        ]
+
+    def scrobble(self, session):
+        return [
+            ('0x7f%010x' % self.rnd.getrandbits(40), 'Library item %s \'Episode %s\' got played by account 1!' % (
+                session.rating_key, session.rating_key
+            ))
+        ]
+
+    def batch(self):
+        """Generate one request block for every session (and the noise/scrobble lines around them)
+
+        :rtype: list of (thread, message)
+        """
+        blocks = []
+
+        for session in self.sessions:
+            lines = self.noise_lines(session) + self.block(session)
+
+            if self.rnd.random() < self.scrobble_rate:
+                lines += self.scrobble(session)
+
+            blocks.append(lines)
+
+        if not self.interleave:
+            return [line for lines in blocks for line in lines]
+
+        # Interleave lines from concurrent blocks (preserving the order within each block)
+        result = []
+
+        while blocks:
+            lines = self.rnd.choice(blocks)
+            result.append(lines.pop(0))
+
+            if not lines:
+                blocks.remove(lines)
+
+        return result
+
+    def lines(self, count):
+        """Generate :code:`count` log lines
+
+        :rtype: list of str
+        """
+        result = []
+
+        while len(result) < count:
+            for thread, message in self.batch():
+                result.append(self.header(thread) + message)
+
+        return result[:count]
+
+    def write(self, fp, count):
+        """Write :code:`count` log lines to :code:`fp`"""
+        for line in self.lines(count):
+            fp.write(line + '\n')
+
+    def stream(self, fp, rate, duration):
+        """Append lines to :code:`fp` at :code:`rate` lines/sec for :code:`duration` seconds
+
+        :return: Number of lines written
+        :rtype: int
+        """
+        started = time.time()
+        written = 0
+
+        while True:
+            elapsed = time.time() - started
+
+            if elapsed >= duration:
+                break
+
+            expected = int(elapsed * rate)
+
+            if written < expected:
+                self.write(fp, expected - written)
+                fp.flush()
+
+                written = expected
+            else:
+                time.sleep(0.005)
+
+        return written
+
+
+class NotificationGenerator(object):
+    """Generates websocket :code:`NotificationContainer` payloads (PMS 1.3.0+)
+
+    :param weights: Relative frequency of each message type
+    :type weights: dict
+    """
+
+    default_weights = {
+        'playing': 4,
+        'timeline': 4,
+        'status': 1,
+        'progress': 1
+    }
+
+    def __init__(self, sessions=10, weights=None, seed=None):
+        self.rnd = random.Random(seed)
+
+        self.sessions = [Session(self.rnd, x) for x in range(sessions)]
+
+        self.types = []
+
+        for key, weight in sorted((weights or self.default_weights).items()):
+            self.types.extend([key] * weight)
+
+    def playing(self):
+        session = self.rnd.choice(self.sessions)
+        session.time = min(session.time + 1000, session.duration)
+
+        return {
+            'type': 'playing',
+            'size': 1,
+            'PlaySessionStateNotification': [{
+                'sessionKey': str(session.index),
+                'clientIdentifier': session.machine_identifier,
+                'guid': '',
+                'ratingKey': str(session.rating_key),
+                'url': '',
+                'key': '/library/metadata/%s' % session.rating_key,
+                'viewOffset': session.time,
+                'playQueueItemID': session.index,
+                'state': self.rnd.choice(STATES)
+            }]
+        }
+
+    def timeline(self):
+        count = self.rnd.randint(1, 5)
+
+        return {
+            'type': 'timeline',
+            'size': count,
+            'TimelineEntry': [{
+                'identifier': 'com.plexapp.plugins.library',
+                'sectionID': str(self.rnd.randint(1, 5)),
+                'itemID': str(self.rnd.randint(1000, 99999)),
+                'type': 4,
+                'title': 'Episode',
+                'state': self.rnd.choice(TIMELINE_STATES),
+                'updatedAt': int(time.time())
+            } for _ in range(count)]
+        }
+
+    def status(self):
+        if self.rnd.random() < 0.5:
+            title = 'Library scan complete'
+        else:
+            title = 'Scanning the "TV Shows" section'
+
+        return {
+            'type': 'status',
+            'size': 1,
+            'StatusNotification': [{
+                'title': title,
+                'description': '',
+                'notificationName': 'LIBRARY_UPDATE'
+            }]
+        }
+
+    def progress(self):
+        return {
+            'type': 'progress',
+            'size': 1,
+            'ProgressNotification': [{
+                'message': 'Scanning Episode %d' % self.rnd.randint(1, 100)
+            }]
+        }
+
+    def message(self):
+        """Generate a notification
+
+        :rtype: dict
+        """
+        m_type = self.rnd.choice(self.types)
+
+        return {'NotificationContainer': getattr(self, m_type)()}
+
+    def frames(self, count):
+        """Generate :code:`count` encoded websocket frames
+
+        :rtype: list of str
+        """
+        return [json.dumps(self.message()) for _ in range(count)]
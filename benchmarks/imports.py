@@ -0,0 +1,56 @@
+"""Benchmark import time (each import is measured in a fresh interpreter)
+
+Usage: python benchmarks/imports.py [--repeat 5] [modules...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = [
+    'plex_activity',
+    'plex_activity.events',
+    'plex_activity.activity'
+]
+
+SCRIPT = 'import time; started = time.time(); import %s; print(time.time() - started)'
+
+SCRIPT_GLOBAL = (
+    'import time; started = time.time(); from plex_activity import Activity; Activity.get(); '
+    'print(time.time() - started)'
+)
+
+
+def measure(script, repeat):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([
+        os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+        env.get('PYTHONPATH', '')
+    ])
+
+    results = []
+
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', script], env=env)
+        results.append(float(output.strip()))
+
+    return min(results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args()
+
+    print('%-36s %12s' % ('import', 'ms (best)'))
+
+    for module in args.modules:
+        print('%-36s %12.2f' % (module, measure(SCRIPT % module, args.repeat) * 1000))
+
+    print('%-36s %12.2f' % ('plex_activity.Activity (constructed)', measure(SCRIPT_GLOBAL, args.repeat) * 1000))
+
+
+if __name__ == '__main__':
+    main()
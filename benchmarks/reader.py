@@ -0,0 +1,70 @@
+"""Measure the number of lines/sec the "logging" source reader can sustain.
+
+Usage: python benchmarks/reader.py [--lines 200000] [--chunk-size 65536]
+"""
+import logging
+logging.basicConfig(level=logging.WARN)
+
+from plex_activity.sources.s_logging.reader import LogReader
+
+from asio import ASIO
+from generators import LogGenerator
+import argparse
+import os
+import tempfile
+import time
+
+
+def write_log(path, count):
+    with open(path, 'w') as fp:
+        LogGenerator(seed=1).write(fp, count)
+
+
+def measure(path, chunk_size):
+    fp = ASIO.open(path, opener=False)
+    reader = LogReader(fp, chunk_size=chunk_size)
+
+    count = 0
+    started = time.time()
+
+    while True:
+        line = reader.read_line()
+
+        if line is None:
+            break
+
+        count += 1
+
+    elapsed = time.time() - started
+
+    reader.close()
+    fp.close()
+
+    return count, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=64 * 1024)
+
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+
+    try:
+        write_log(path, args.lines)
+
+        count, elapsed = measure(path, args.chunk_size)
+
+        print('read %d lines (%.1f MB) in %.3fs - %.0f lines/sec' % (
+            count, os.path.getsize(path) / (1024.0 * 1024.0),
+            elapsed, count / elapsed
+        ))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark the activity pipeline (offline, no Plex Media Server required).
+
+ - logging: lines/sec through :code:`Logging.process`
+ - websocket: messages/sec through :code:`WebSocket.process`
+ - ws-playing: messages/sec through :code:`WebSocket.process` (only "websocket.playing" subscribed)
+ - activity: event emission overhead through :code:`Activity`
+
+Usage: python benchmarks/run.py [--lines 100000] [--messages 50000] [--events 200000] [--sessions 20]
+"""
+import logging
+logging.basicConfig(level=logging.WARN)
+
+from plex_activity.activity import Activity
+from plex_activity.core import decoder
+from plex_activity.sources import Logging, WebSocket
+
+from generators import LogGenerator, NotificationGenerator
+import argparse
+import time
+
+OPCODE_TEXT = 1
+
+
+class Counter(object):
+    def __init__(self, activity, events):
+        self.count = 0
+
+        for event in events:
+            activity.on(event, self)
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def measure(func, items):
+    started = time.time()
+
+    for item in items:
+        func(item)
+
+    return time.time() - started
+
+
+def bench_logging(args):
+    lines = LogGenerator(sessions=args.sessions, seed=1).lines(args.lines)
+
+    activity = Activity()
+    counter = Counter(activity, Logging.events)
+
+    source = Logging(activity)
+    elapsed = measure(source.process, lines)
+
+    return 'logging', len(lines), elapsed, counter.count
+
+
+def bench_websocket(args):
+    frames = NotificationGenerator(sessions=args.sessions, seed=1).frames(args.messages)
+
+    activity = Activity()
+    counter = Counter(activity, WebSocket.events)
+
+    source = WebSocket(activity)
+    elapsed = measure(lambda data: source.process(OPCODE_TEXT, data), frames)
+
+    return 'websocket', len(frames), elapsed, counter.count
+
+
+def bench_websocket_filtered(args):
+    frames = NotificationGenerator(sessions=args.sessions, seed=1).frames(args.messages)
+
+    activity = Activity()
+    counter = Counter(activity, ['websocket.playing'])
+
+    source = WebSocket(activity)
+    elapsed = measure(lambda data: source.process(OPCODE_TEXT, data), frames)
+
+    return 'ws-playing', len(frames), elapsed, counter.count
+
+
+def bench_activity(args):
+    activity = Activity()
+    counter = Counter(activity, ['logging.playing'])
+
+    payload = {'ratingKey': '1000', 'state': 'playing', 'time': '1000'}
+    elapsed = measure(lambda _: activity.emit('logging.playing', payload), range(args.events))
+
+    return 'activity', args.events, elapsed, counter.count
+
+
+BENCHMARKS = [
+    ('logging', bench_logging),
+    ('websocket', bench_websocket),
+    ('ws-playing', bench_websocket_filtered),
+    ('activity', bench_activity)
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('benchmarks', nargs='*', default=[name for name, _ in BENCHMARKS])
+
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--sessions', type=int, default=20)
+
+    args = parser.parse_args()
+
+    print('json backend: %s' % decoder.BACKEND)
+    print()
+
+    print('%-10s %10s %10s %14s %12s %10s' % ('benchmark', 'items', 'seconds', 'items/sec', 'us/item', 'events'))
+
+    for name, func in BENCHMARKS:
+        if name not in args.benchmarks:
+            continue
+
+        name, count, elapsed, events = func(args)
+
+        print('%-10s %10d %10.3f %14.0f %12.2f %10d' % (
+            name, count, elapsed, count / elapsed, (elapsed / count) * 1000000, events
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,10 +6,47 @@ log = logging.getLogger(__name__)
 __version__ = '0.7.1'
 
 
-try:
-    from plex_activity import activity
+class ActivityProxy(object):
+    """Global activity instance (using defaults), the sources and their dependencies are only imported
+    when the instance is first used
+    """
 
-    # Global objects (using defaults)
-    Activity = activity.Activity()
-except Exception as ex:
-    log.warn('Unable to import submodules: %s - %s', ex, traceback.format_exc())
+    def __init__(self):
+        self._instance = None
+
+    def get(self):
+        if self._instance is None:
+            try:
+                from plex_activity.activity import Activity as ActivityClass
+            except Exception as ex:
+                log.warn('Unable to import submodules: %s - %s', ex, traceback.format_exc())
+                raise
+
+            self._instance = ActivityClass()
+
+        return self._instance
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            return super(ActivityProxy, self).__setattr__(name, value)
+
+        setattr(self.get(), name, value)
+
+    def __getitem__(self, key):
+        return self.get()[key]
+
+    def __repr__(self):
+        if self._instance is None:
+            return '<ActivityProxy (not constructed)>'
+
+        return repr(self._instance)
+
+
+# Global objects (using defaults)
+Activity = ActivityProxy()
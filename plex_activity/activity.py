@@ -1,9 +1,21 @@
 from plex.lib import six as six
 from plex.lib.six.moves import xrange
+from plex_activity.core.dispatch import DispatchQueue, OVERFLOW_BLOCK
+from plex_activity.core.health import HealthMonitor
+from plex_activity.core.helpers import has_listeners
+from plex_activity.core.latency import Latency, STAGES
+from plex_activity.core.metrics import Registry, timer
+from plex_activity.core.ready import Ready
+from plex_activity.core.server import Server
+from plex_activity.merge import PlaybackMerger
+from plex_activity.sessions import SessionTracker
 from plex_activity.sources import Logging, WebSocket
 
 from pyemitter import Emitter
+from threading import Thread
 import logging
+import time
+import traceback
 
 log = logging.getLogger(__name__)
 
@@ -21,38 +33,350 @@ class ActivityMeta(type):
 class Activity(Emitter):
     registered = []
 
-    def __init__(self, sources=None):
+    # Seconds to wait for each source test in `start()`
+    start_timeout = 10
+
+    # Incremented each time callbacks are bound or unbound (used by sources to cache subscription checks)
+    subscriptions_version = 0
+
+    def __init__(self, sources=None, servers=None, metrics=True):
         self.available = self.get_available(sources)
         self.enabled = []
 
-    def start(self, sources=None):
-        # TODO async start
+        # Source readiness, keyed by source name (see `start()`)
+        self.ready = {}
+
+        # Servers to monitor (defaults to the server in `Plex.configuration`)
+        self.servers = [Server.parse(server) for server in servers] if servers else None
+
+        # Server the log file belongs to (when monitoring multiple servers)
+        self.local = self.get_local_server()
+
+        # Playback session tracker (see `track_sessions()`)
+        self.sessions = None
+
+        # Merged websocket/logging playback stream (see `merge_playing()`)
+        self.merger = None
+
+        # Asynchronous dispatch queue (see `enable_queue()`)
+        self.queue = None
 
+        # Pipeline metrics (see `plex_activity.core.metrics.Registry`)
+        self.metrics = Registry(enabled=metrics)
+
+        self.metric_events = self.metrics.counter(
+            'plex_activity_events_total', 'Events emitted by sources', ['event']
+        )
+
+        self.metric_listeners = self.metrics.histogram(
+            'plex_activity_listener_seconds', 'Time spent in event callbacks', ['event']
+        )
+
+        self.metric_latency = self.metrics.histogram(
+            'plex_activity_event_latency_seconds', 'Event latency (ingest: origin -> received, '
+            'dispatch: received -> delivered, total: origin -> delivered)', ['source', 'stage'],
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+        )
+
+        # Rolling latency distributions, keyed by source name
+        self.latencies = {}
+
+        # Server health monitor, shared by the sources (started by `start()`, see `monitor_health()`)
+        self.health = HealthMonitor(self, self.servers)
+
+    def start(self, sources=None, timeout=None):
+        """Test and start the available sources concurrently (returns immediately)"""
         if sources is not None:
             self.available = self.get_available(sources)
 
-        # Test methods until an available method is found
+        if timeout is None:
+            timeout = self.start_timeout
+
+        self.health.start()
+
         for weight, source in self.available:
-            if weight is None:
+            ready = self.ready[source.name] = Ready(source.name)
+
+            thread = Thread(
+                target=self.start_candidate, args=(weight, source, ready, timeout),
+                name='activity-start-%s' % source.name
+            )
+            thread.daemon = True
+            thread.start()
+
+        return self.ready
+
+    def start_candidate(self, weight, source, ready, timeout):
+        try:
+            if source.name == WebSocket.name and self.servers:
+                # Multiplex connections to each server on a single event loop
+                instance = self.start_multiplexer(ready)
+            elif not self.has_server(source):
+                log.info('activity source "%s" is not available (no local server configured)', source.name)
+                ready.set_result(False)
+                return
+            elif weight is None:
                 # None = always start
-                self.start_source(source)
-            elif source.test():
+                instance = self.start_source(source, ready)
+            elif self.test_source(source, timeout):
                 # Test passed
-                self.start_source(source)
+                instance = self.start_source(source, ready)
             else:
                 log.info('activity source "%s" is not available', source.name)
+                ready.set_result(False)
+                return
+        except Exception as ex:
+            log.error('Unable to start activity source "%s": %s', source.name, ex, exc_info=True)
+            ready.set_exception(ex)
+            return
 
-        log.info(
-            'Finished starting %s method(s): %s',
-            len(self.enabled),
-            ', '.join([('"%s"' % source.name) for source in self.enabled])
-        )
+        log.info('Started activity source "%s"', instance.name)
+
+    def test_source(self, source, timeout):
+        """Test if :code:`source` is available, tests that take longer than :code:`timeout` seconds fail"""
+        result = []
+
+        thread = Thread(target=lambda: result.append(source.test()), name='activity-test-%s' % source.name)
+        thread.daemon = True
+        thread.start()
+
+        thread.join(timeout)
+
+        if not result:
+            log.warn('Test for activity source "%s" failed or timed out after %s seconds', source.name, timeout)
+            return False
+
+        return result[0]
+
+    def start_source(self, source, ready=None):
+        if source.name == Logging.name and self.local is not None:
+            # Tag log events with the server the log belongs to
+            instance = source(self, self.local)
+        else:
+            instance = source(self)
+
+        if ready is not None:
+            instance.ready = ready
+
+        instance.start()
+
+        self.enabled.append(instance)
+        return instance
+
+    def get_local_server(self):
+        if not self.servers:
+            return None
+
+        for server in self.servers:
+            if server.local:
+                return server
+
+        return None
+
+    def has_server(self, source):
+        # The log file only belongs to a local server, events from other servers can't be tagged
+        return source.name != Logging.name or not self.servers or self.local is not None
+
+    def start_multiplexer(self, ready=None):
+        from plex_activity.sources.s_websocket.multiplex import WebSocketMultiplexer
+
+        instance = WebSocketMultiplexer(self, self.servers)
+
+        if ready is not None:
+            instance.ready = ready
 
-    def start_source(self, source):
-        instance = source(self)
         instance.start()
 
         self.enabled.append(instance)
+        return instance
+
+    def wait_ready(self, timeout=None):
+        """Wait for the started sources to become ready (or fail)"""
+        deadline = (time.time() + timeout) if timeout is not None else None
+        results = {}
+
+        for name, ready in list(self.ready.items()):
+            remaining = None
+
+            if deadline is not None:
+                remaining = max(deadline - time.time(), 0)
+
+            if not ready.wait(remaining):
+                results[name] = None
+            else:
+                results[name] = ready.exception() is None and bool(ready.result())
+
+        return results
+
+    def on(self, events, func=None, on_bound=None):
+        result = super(Activity, self).on(events, func, on_bound)
+
+        if func:
+            self.subscriptions_version += 1
+
+        return result
+
+    def off(self, event=None, func=None):
+        result = super(Activity, self).off(event, func)
+
+        self.subscriptions_version += 1
+        return result
+
+    def dispatch(self, event, *args, **kwargs):
+        """Call the callbacks bound to :code:`event` (used by sources to deliver events in a single hop)"""
+        self.metric_events.labels(event).inc()
+
+        if self.queue is not None:
+            self.queue.put(event, args, kwargs)
+            return self
+
+        if self.threading:
+            return self.emit(event, *args, **kwargs)
+
+        return self.call(event, args, kwargs)
+
+    def call(self, event, args, kwargs):
+        callbacks = getattr(self, '_Emitter__callbacks', None)
+
+        if not callbacks:
+            return self
+
+        funcs = callbacks.get(event)
+
+        if not funcs:
+            return self
+
+        # Measure the latency of events from live sources
+        info = args[0] if args else None
+
+        if type(info) is dict and info.get('received') is not None:
+            self.observe_latency(event, info)
+
+        histogram = self.metric_listeners.labels(event)
+
+        for func in list(funcs):
+            started = timer()
+
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                log.warn('Exception raised in callback %s for event "%s" - %s', func, event, traceback.format_exc())
+
+            histogram.observe(timer() - started)
+
+        return self
+
+    def observe_latency(self, event, info):
+        source = event.partition('.')[0]
+        latency = self.latencies.get(source)
+
+        if latency is None:
+            latency = self.latencies[source] = Latency()
+
+        values = latency.observe(info['origin'], info['received'], time.time())
+
+        for stage, value in zip(STAGES, values):
+            self.metric_latency.labels(source, stage).observe(value)
+
+    def latency(self, source=None):
+        """Retrieve the rolling latency distribution of events from each source"""
+        if source is not None:
+            latency = self.latencies.get(source)
+
+            return latency.summary() if latency else None
+
+        return dict([
+            (name, latency.summary())
+            for name, latency in list(self.latencies.items())
+        ])
+
+    def enable_queue(self, workers=2, maxsize=1000, overflow=OVERFLOW_BLOCK, key=None):
+        """Run callbacks for source events on a pool of worker threads (so slow callbacks don't stall
+        the sources), events with the same name are always handled in order
+        """
+        if self.queue is not None:
+            self.disable_queue()
+
+        queue = self.queue = DispatchQueue(self.call, workers, maxsize, overflow, key)
+        queue.start()
+
+        # Queue metrics
+        self.metrics.gauge('plex_activity_queue_depth', 'Queued events', function=lambda: queue.depth)
+        self.metrics.gauge('plex_activity_queue_max_depth', 'Highest number of queued events', function=lambda: queue.max_depth)
+
+        for name in ['dispatched', 'dropped', 'coalesced', 'blocked']:
+            self.metrics.counter(
+                'plex_activity_queue_%s_total' % name, 'Queued events %s' % name,
+                function=lambda name=name: getattr(queue, name)
+            )
+
+        return self.queue
+
+    def disable_queue(self, timeout=None):
+        """Dispatch the queued events, then return to calling callbacks on the source threads"""
+        if self.queue is None:
+            return
+
+        queue, self.queue = self.queue, None
+        queue.stop(timeout)
+
+    def has_listeners(self, *events):
+        """Check if any callbacks are bound to :code:`events`"""
+        return has_listeners(self, *events)
+
+    def listeners(self):
+        """Retrieve the names of events that have callbacks bound"""
+        callbacks = getattr(self, '_Emitter__callbacks', None) or {}
+
+        return set([event for event, funcs in callbacks.items() if funcs])
+
+    def track_sessions(self, progress_interval=10, seek_threshold=15, timeout=120):
+        """Track playback sessions, emitting :code:`session.*` events on state transitions
+        (started, paused, resumed, seeked, stopped) and throttled :code:`session.progress` events
+        """
+        if self.sessions is None:
+            self.sessions = SessionTracker(self, progress_interval, seek_threshold, timeout)
+        else:
+            self.sessions.progress_interval = progress_interval
+            self.sessions.seek_threshold = seek_threshold
+            self.sessions.timeout = timeout
+
+        self.sessions.bind()
+        return self.sessions
+
+    def merge_playing(self, window=2):
+        """Emit a single normalized :code:`playing` event for each playback update, merging the
+        :code:`websocket.playing` and :code:`logging.playing` reports of the same update
+        """
+        if self.merger is None:
+            self.merger = PlaybackMerger(self, window)
+        else:
+            self.merger.window = window
+
+        self.merger.bind()
+        return self.merger
+
+    def monitor_health(self, interval=60):
+        """Check the servers every :code:`interval` seconds (by default servers are only checked when
+        a source stops receiving data)
+        """
+        self.health.interval = interval
+        self.health.start()
+
+        for name in self.health.names:
+            self.health.request(name)
+
+        return self.health
+
+    def replay(self, paths=None):
+        """Replay historical "Plex Media Server.log" files, emitting :code:`logging.*` events"""
+        return Logging(self).replay(paths)
+
+    def backfill(self, paths=None, processes=None):
+        """Parse historical "Plex Media Server.log" files across a process pool, emitting
+        :code:`logging.*` events in timestamp order
+        """
+        return Logging(self).backfill(paths, processes=processes)
 
     def __getitem__(self, key):
         for (weight, source) in self.registered:
@@ -0,0 +1,176 @@
+from plex_activity.activity import Activity
+from plex_activity.core.ready import Ready
+from plex_activity.sources.s_logging.aio import AsyncLogging
+from plex_activity.sources.s_websocket.aio import AsyncWebSocket
+from plex_activity.sources.s_websocket.multiplex import WebSocketGroup
+
+import asyncio
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class EventStream(object):
+    """Async iterator over activity events, yields :code:`(event, info)` tuples"""
+
+    def __init__(self, activity, events, maxsize=0):
+        self.activity = activity
+
+        self.loop = asyncio.get_event_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+        self.thread = threading.current_thread()
+        self.closed = False
+
+        # Bind handlers
+        self.handlers = {}
+
+        for event in events:
+            self.handlers[event] = self._create_handler(event)
+            self.activity.on(event, self.handlers[event])
+
+    def close(self):
+        if self.closed:
+            return
+
+        for event, handler in self.handlers.items():
+            self.activity.off(event, handler)
+
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+
+        return await self.queue.get()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _create_handler(self, event):
+        def handler(info=None):
+            if threading.current_thread() is self.thread:
+                self._put((event, info))
+            else:
+                # Event emitted by a thread (e.g. executor), hand off to the event loop
+                self.loop.call_soon_threadsafe(self._put, (event, info))
+
+        return handler
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            log.warning('Event stream is full, dropping %r event', item[0])
+
+
+class AsyncActivity(Activity):
+    """Activity monitor for asyncio applications
+
+    Sources run as tasks on the event loop (instead of threads), events can be consumed with callbacks
+    (:code:`on()`), :code:`events()` (async iterator) or :code:`wait_for()`.
+    """
+
+    # Async implementations of the registered sources
+    sources = {
+        'logging': AsyncLogging,
+        'websocket': AsyncWebSocket
+    }
+
+    async def start(self, sources=None, timeout=None):
+        """Test and start the available sources concurrently"""
+        if sources is not None:
+            self.available = self.get_available(sources)
+
+        if timeout is None:
+            timeout = self.start_timeout
+
+        # Health checks run on a thread, so they never block the event loop
+        self.health.start()
+
+        candidates = []
+
+        for weight, source in self.available:
+            if source.name not in self.sources:
+                log.info('activity source "%s" has no asyncio implementation', source.name)
+                continue
+
+            ready = self.ready[source.name] = Ready(source.name)
+
+            candidates.append(self.start_candidate_async(weight, self.sources[source.name], ready, timeout))
+
+        await asyncio.gather(*candidates)
+
+        return self.ready
+
+    async def start_candidate_async(self, weight, source, ready, timeout):
+        loop = asyncio.get_event_loop()
+
+        if source.name == AsyncWebSocket.name and self.servers:
+            # Connect to each server (as tasks on the running event loop)
+            self.start_multiplexer(ready)
+
+            log.info('Started activity source "%s"', source.name)
+            return
+
+        if not self.has_server(source):
+            log.info('activity source "%s" is not available (no local server configured)', source.name)
+            ready.set_result(False)
+            return
+
+        if weight is not None:
+            try:
+                available = await asyncio.wait_for(loop.run_in_executor(None, source.test), timeout)
+            except asyncio.TimeoutError:
+                log.warning('Test for activity source "%s" timed out after %s seconds', source.name, timeout)
+                available = False
+
+            if not available:
+                log.info('activity source "%s" is not available', source.name)
+                ready.set_result(False)
+                return
+
+        self.start_source(source, ready)
+
+        log.info('Started activity source "%s"', source.name)
+
+    def start_multiplexer(self, ready=None):
+        instance = WebSocketGroup(self, self.servers)
+
+        if ready is not None:
+            instance.ready = ready
+
+        instance.start()
+
+        self.enabled.append(instance)
+        return instance
+
+    async def wait_ready_async(self, timeout=None):
+        """Wait for the started sources to become ready (or fail), without blocking the event loop"""
+        return await asyncio.get_event_loop().run_in_executor(None, self.wait_ready, timeout)
+
+    async def stop(self):
+        for instance in self.enabled:
+            await instance.stop()
+
+        self.enabled = []
+
+        await asyncio.get_event_loop().run_in_executor(None, self.health.stop)
+
+    def events(self, *events, **kwargs):
+        """Iterate over events as they are emitted"""
+        return EventStream(self, events, kwargs.get('maxsize', 0))
+
+    async def wait_for(self, event, timeout=None):
+        """Wait for the next :code:`event`"""
+        with self.events(event) as stream:
+            _, info = await asyncio.wait_for(stream.__anext__(), timeout)
+
+        return info
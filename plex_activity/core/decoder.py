@@ -0,0 +1,68 @@
+import logging
+import re
+
+log = logging.getLogger(__name__)
+
+try:
+    import orjson as backend
+
+    BACKEND = 'orjson'
+except ImportError:
+    try:
+        import ujson as backend
+
+        BACKEND = 'ujson'
+    except ImportError:
+        try:
+            import simplejson as backend
+
+            BACKEND = 'simplejson'
+        except ImportError:
+            import json as backend
+
+            BACKEND = 'json'
+
+# Only the start of the message is searched for the notification type
+PEEK_LENGTH = 256
+
+TYPE_PATTERN = r'"type"\s*:\s*"(?P<type>[^"\\]*)"'
+
+TYPE_REGEX = re.compile(TYPE_PATTERN)
+TYPE_REGEX_BYTES = re.compile(TYPE_PATTERN.encode('ascii'))
+
+
+def loads(data):
+    return backend.loads(data)
+
+
+def peek_type(data):
+    if isinstance(data, bytes):
+        match = TYPE_REGEX_BYTES.search(data, 0, PEEK_LENGTH)
+    else:
+        match = TYPE_REGEX.search(data, 0, PEEK_LENGTH)
+
+    if not match:
+        return None
+
+    # Ensure the field isn't inside a child object
+    prefix = data[:match.start()]
+
+    if isinstance(prefix, bytes):
+        prefix = prefix.decode('utf-8', 'replace')
+
+    if '[' in prefix:
+        return None
+
+    depth = prefix.count('{') - prefix.count('}')
+
+    if depth == 1:
+        value = match.group('type')
+    elif depth == 2 and '"NotificationContainer"' in prefix:
+        value = match.group('type')
+    else:
+        return None
+
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+
+    return value
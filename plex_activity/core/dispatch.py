@@ -0,0 +1,229 @@
+from collections import deque
+from threading import Condition, Thread, current_thread
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP_OLDEST = 'drop-oldest'
+OVERFLOW_COALESCE = 'coalesce'
+
+OVERFLOW_POLICIES = [
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_OLDEST,
+    OVERFLOW_COALESCE
+]
+
+
+def coalesce_key(event, args, kwargs):
+    info = args[0] if args else None
+
+    if type(info) is not dict:
+        return None
+
+    return (
+        event,
+        info.get('server'),
+        info.get('sessionKey') or info.get('machineIdentifier') or info.get('clientIdentifier'),
+        info.get('ratingKey') or info.get('itemID')
+    )
+
+
+class Item(object):
+    __slots__ = ('event', 'key', 'args', 'kwargs')
+
+    def __init__(self, event, key, args, kwargs):
+        self.event = event
+        self.key = key
+
+        self.args = args
+        self.kwargs = kwargs
+
+
+class Worker(object):
+    """Worker thread with its own queue (events are assigned to workers by name, so events with the
+    same name are always handled in order), the queues share the :code:`DispatchQueue` bound
+    """
+
+    def __init__(self, queue, index):
+        self.queue = queue
+        self.index = index
+
+        self.items = deque()
+        self.pending = {}
+
+        # Shared by every worker (producers wait for space in any queue)
+        self.condition = queue.condition
+        self.running = False
+
+        self.thread = Thread(target=self.run, name='activity-dispatch-%d' % index)
+        self.thread.daemon = True
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        self.thread.join(timeout)
+
+    def put(self, event, args, kwargs):
+        queue = self.queue
+        key = None
+
+        if queue.overflow == OVERFLOW_COALESCE:
+            key = queue.key(event, args, kwargs)
+
+        with self.condition:
+            if queue.size >= queue.maxsize:
+                if queue.overflow == OVERFLOW_BLOCK:
+                    queue.blocked += 1
+
+                    while self.running and queue.size >= queue.maxsize:
+                        self.condition.wait()
+
+                    if not self.running:
+                        # Stopped while waiting for space
+                        log.warning('Dispatch queue has been stopped, dropping %r event', event)
+                        return False
+                elif key is not None and key in self.pending:
+                    # Replace the queued item (keeping its position)
+                    item = self.pending[key]
+                    item.args = args
+                    item.kwargs = kwargs
+
+                    queue.coalesced += 1
+                    return True
+                else:
+                    # Drop the oldest event (from the longest queue, if this worker has nothing queued)
+                    worker = self if self.items else max(queue.workers, key=lambda w: len(w.items))
+                    worker.discard(worker.items.popleft())
+
+                    queue.size -= 1
+                    queue.dropped += 1
+
+            item = Item(event, key, args, kwargs)
+
+            self.items.append(item)
+
+            if key is not None:
+                self.pending[key] = item
+
+            queue.size += 1
+
+            if queue.size > queue.max_depth:
+                queue.max_depth = queue.size
+
+            self.condition.notify_all()
+
+        return True
+
+    def discard(self, item):
+        if item.key is not None and self.pending.get(item.key) is item:
+            del self.pending[item.key]
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.items:
+                    self.condition.wait()
+
+                if not self.items:
+                    # Stopped, and the queue has been drained
+                    return
+
+                item = self.items.popleft()
+                self.discard(item)
+
+                self.queue.size -= 1
+
+                # Wake producers waiting for space
+                self.condition.notify_all()
+
+            self.queue.call(item.event, item.args, item.kwargs)
+            self.queue.dispatched += 1
+
+
+class DispatchQueue(object):
+    """Runs event callbacks on a pool of worker threads"""
+
+    def __init__(self, call, workers=2, maxsize=1000, overflow=OVERFLOW_BLOCK, key=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Unknown overflow policy: %r' % (overflow,))
+
+        if workers < 1 or maxsize < 1:
+            raise ValueError('"workers" and "maxsize" must be greater than zero')
+
+        self.call = call
+
+        # Maximum number of queued events (across all workers)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.key = key or coalesce_key
+
+        self.condition = Condition()
+        self.size = 0
+
+        self.workers = [Worker(self, x) for x in range(workers)]
+        self.threads = set()
+
+        # Metrics
+        self.dispatched = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        return self.size
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+        self.threads = set([worker.thread for worker in self.workers])
+
+    def stop(self, timeout=None):
+        started = time.time()
+
+        for worker in self.workers:
+            remaining = None
+
+            if timeout is not None:
+                remaining = max(timeout - (time.time() - started), 0)
+
+            worker.stop(remaining)
+
+        self.threads = set()
+
+    def put(self, event, args, kwargs):
+        if current_thread() in self.threads:
+            # Event emitted by a callback, dispatch it immediately (blocking here could deadlock the worker)
+            self.call(event, args, kwargs)
+            return True
+
+        worker = self.workers[hash(event) % len(self.workers)]
+
+        if not worker.running:
+            log.warning('Dispatch queue has been stopped, dropping %r event', event)
+            return False
+
+        return worker.put(event, args, kwargs)
+
+    def metrics(self):
+        return {
+            'depth': self.depth,
+            'depths': [len(worker.items) for worker in self.workers],
+            'max_depth': self.max_depth,
+
+            'dispatched': self.dispatched,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'blocked': self.blocked
+        }
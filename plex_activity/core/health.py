@@ -0,0 +1,233 @@
+from plex.lib.six.moves.urllib.request import Request, urlopen
+from plex_activity.core.helpers import get_dispatch
+from plex_activity.core.metrics import get_registry, timer
+from plex_activity.events import HEALTH_CHANGED
+
+from threading import Event, Lock, Thread
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+def ping(server=None, timeout=10):
+    if server is None:
+        # Default server (in `Plex.configuration`)
+        from plex import Plex
+
+        return Plex.detail() is not None
+
+    request = Request('http://%s:%s/identity' % (server.host, server.port))
+
+    if server.token:
+        request.add_header('X-Plex-Token', server.token)
+
+    response = urlopen(request, timeout=timeout)
+
+    try:
+        return response.getcode() == 200
+    finally:
+        response.close()
+
+
+class ServerHealth(object):
+    __slots__ = ('server', 'available', 'checked', 'changed', 'duration', 'error', 'failures')
+
+    def __init__(self, server):
+        self.server = server
+
+        # `None` until the server has been checked
+        self.available = None
+
+        self.checked = None
+        self.changed = None
+        self.duration = None
+        self.error = None
+
+        # Number of consecutive failed checks
+        self.failures = 0
+
+    @property
+    def name(self):
+        return self.server.name if self.server is not None else None
+
+    def to_dict(self):
+        return {
+            'server': self.name,
+            'available': self.available,
+            'checked': self.checked,
+            'changed': self.changed,
+            'duration': self.duration,
+            'failures': self.failures,
+            'error': str(self.error) if self.error is not None else None
+        }
+
+    def __repr__(self):
+        if self.available is None:
+            state = 'unchecked'
+        else:
+            state = 'available' if self.available else 'unavailable'
+
+        return '<ServerHealth %r (%s, failures: %d)>' % (self.name, state, self.failures)
+
+
+class HealthMonitor(object):
+    """Checks the monitored servers on a background thread (so sources never block on a server)
+
+    Sources request a check of their server when they go quiet, periodic checks are only made when
+    :code:`interval` is set (see :code:`Activity.monitor_health()`).
+    """
+
+    def __init__(self, activity, servers=None, interval=None, check=None):
+        self.activity = activity
+        self.interval = interval
+        self.check = check or ping
+
+        # Health of each server, keyed by server name (`None` = server in `Plex.configuration`)
+        self.names = [server.name if server is not None else None for server in (servers or [None])]
+
+        self.servers = dict([
+            (name, ServerHealth(server))
+            for name, server in zip(self.names, servers or [None])
+        ])
+
+        self.thread = None
+
+        self._requested = set()
+        self._wake = Event()
+        self._stopped = Event()
+        self._lock = Lock()
+
+        # Metrics
+        registry = get_registry(activity)
+
+        self.metric_available = registry.gauge(
+            'plex_activity_server_available', 'Server is available (1), unavailable (0), or unchecked (-1)', ['server']
+        )
+
+        self.metric_checks = registry.histogram(
+            'plex_activity_health_check_seconds', 'Time spent checking servers', ['server', 'result']
+        )
+
+        for name in self.names:
+            self.metric_available.labels(name or '').set(-1)
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+
+            self._stopped.clear()
+
+            self.thread = Thread(target=self.run, name='activity-health')
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            thread, self.thread = self.thread, None
+
+        if thread is None:
+            return
+
+        self._stopped.set()
+        self._wake.set()
+
+        thread.join(timeout)
+
+    def request(self, server=None):
+        if server not in self.servers or not self.running:
+            return False
+
+        with self._lock:
+            self._requested.add(server)
+
+        self._wake.set()
+        return True
+
+    def run(self):
+        while not self._stopped.is_set():
+            woken = self._wake.wait(self.interval)
+            self._wake.clear()
+
+            if self._stopped.is_set():
+                break
+
+            with self._lock:
+                requested, self._requested = self._requested, set()
+
+            if not woken:
+                # Periodic check
+                requested = self.names
+
+            for name in requested:
+                self.update(name)
+
+    def update(self, name=None):
+        health = self.servers[name]
+
+        started = timer()
+        error = None
+
+        try:
+            available = bool(self.check(health.server))
+        except Exception as ex:
+            log.debug('Health check of %r failed: %s', name, ex, exc_info=True)
+
+            available = False
+            error = ex
+
+        health.duration = timer() - started
+        health.checked = time.time()
+        health.error = error
+
+        self.metric_checks.labels(name or '', 'available' if available else 'unavailable').observe(health.duration)
+        self.metric_available.labels(name or '').set(int(available))
+
+        if available:
+            health.failures = 0
+        else:
+            health.failures += 1
+
+        if available == health.available:
+            return available
+
+        previous, health.available = health.available, available
+        health.changed = health.checked
+
+        if previous is not None or not available:
+            log.info('Server %s is %s', name or 'default', 'available' if available else 'unavailable')
+
+        try:
+            get_dispatch(self.activity)(HEALTH_CHANGED, health.to_dict())
+        except Exception as ex:
+            log.warn('Unable to emit "%s": %s', HEALTH_CHANGED, ex, exc_info=True)
+
+        return available
+
+    def status(self, server=None):
+        if server is None and None not in self.servers:
+            server = self.names[0]
+
+        health = self.servers.get(server)
+
+        if health is None:
+            return None
+
+        return health.to_dict()
+
+    def statuses(self):
+        return dict([
+            (name, self.servers[name].to_dict())
+            for name in self.names
+        ])
+
+    def __getitem__(self, server):
+        return self.servers[server]
+
+    def __repr__(self):
+        return '<HealthMonitor %r>' % ([self.servers[name] for name in self.names],)
@@ -1,3 +1,6 @@
+import re
+
+
 def str_format(s, *args, **kwargs):
     """Return a formatted version of S, using substitutions from args and kwargs.
 
@@ -42,3 +45,75 @@ def str_format(s, *args, **kwargs):
         x += 1
 
     return s
+
+
+def has_listeners(emitter, *events):
+    callbacks = getattr(emitter, '_Emitter__callbacks', None)
+
+    if not callbacks:
+        return False
+
+    for event in events:
+        if callbacks.get(event):
+            return True
+
+    return False
+
+
+def is_subscribed(activity, *events):
+    func = getattr(activity, 'has_listeners', None)
+
+    if func is None:
+        # Emitters that don't track subscriptions (e.g. backfill collectors) want every event
+        return True
+
+    return func(*events)
+
+
+def get_dispatch(activity):
+    # Deliver events straight to the activity callbacks (other emitters don't have `dispatch()`)
+    return getattr(activity, 'dispatch', None) or activity.emit
+
+
+def to_int(value):
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LazyRegex(object):
+    """Regular expression that is compiled on first use (keeps import time down)
+
+    Attributes of the compiled expression (e.g. :code:`match`) are cached on the instance when they are
+    first accessed, so later calls don't go through :code:`__getattr__`.
+    """
+
+    def __init__(self, pattern, flags=0):
+        self._pattern = pattern
+        self._flags = flags
+
+        self._compiled = None
+
+    def compile(self):
+        if self._compiled is None:
+            pattern = self._pattern
+
+            if callable(pattern):
+                pattern = pattern()
+
+            self._compiled = re.compile(pattern, self._flags)
+
+        return self._compiled
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        value = getattr(self.compile(), name)
+
+        setattr(self, name, value)
+        return value
@@ -0,0 +1,59 @@
+from collections import deque
+
+# Latency stages, measured when events are delivered to callbacks:
+#  - ingest: origin (log line time, or websocket receive time) -> received (line/frame read)
+#  - dispatch: received -> delivered (parsing, request blocks, dispatch queue)
+#  - total: origin -> delivered
+STAGES = ('ingest', 'dispatch', 'total')
+
+PERCENTILES = (50, 90, 99)
+
+
+class Latency(object):
+    """Rolling latency distribution of a source (last :code:`size` events)"""
+
+    def __init__(self, size=1000):
+        self.samples = dict([
+            (stage, deque(maxlen=size))
+            for stage in STAGES
+        ])
+
+        self.count = 0
+
+    def observe(self, origin, received, delivered):
+        values = (
+            received - origin,
+            delivered - received,
+            delivered - origin
+        )
+
+        for stage, value in zip(STAGES, values):
+            self.samples[stage].append(value)
+
+        self.count += 1
+        return values
+
+    def summary(self):
+        result = {'count': self.count}
+
+        for stage in STAGES:
+            result[stage] = summarize(list(self.samples[stage]))
+
+        return result
+
+
+def summarize(values):
+    if not values:
+        return None
+
+    values.sort()
+
+    result = dict([
+        ('p%d' % percentile, values[min(int(len(values) * percentile / 100.0), len(values) - 1)])
+        for percentile in PERCENTILES
+    ])
+
+    result['mean'] = sum(values) / len(values)
+    result['max'] = values[-1]
+
+    return result
@@ -0,0 +1,232 @@
+from bisect import bisect_left
+from threading import Lock
+import time
+
+# Highest resolution timer available
+timer = getattr(time, 'perf_counter', time.time)
+
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+
+class Value(object):
+    """Counter or gauge value"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Histogram(object):
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+
+        self.sum += value
+        self.count += 1
+
+    def get(self):
+        cumulative = []
+        total = 0
+
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+
+        return {
+            'buckets': cumulative,
+            'count': self.count,
+            'sum': self.sum
+        }
+
+
+class Metric(object):
+    """Metric family, values are stored for each combination of label values"""
+
+    def __init__(self, type, name, help, labels=(), buckets=None, function=None):
+        self.type = type
+        self.name = name
+        self.help = help
+
+        self.labelnames = tuple(labels)
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+        self.function = function
+
+        self.children = {}
+        self.lock = Lock()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+
+        if child is not None:
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError('Expected %d label value(s) for %r' % (len(self.labelnames), self.name))
+
+        with self.lock:
+            if values not in self.children:
+                self.children[values] = Histogram(self.buckets) if self.type == HISTOGRAM else Value()
+
+        return self.children[values]
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def samples(self):
+        if self.function is not None:
+            return {(): self.function()}
+
+        return dict([
+            (values, child.get())
+            for values, child in list(self.children.items())
+        ])
+
+
+class NullMetric(object):
+    """Metric that discards values (used when metrics are disabled, or there is no activity instance)"""
+
+    def labels(self, *values):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def samples(self):
+        return {}
+
+
+NULL_METRIC = NullMetric()
+
+
+class Registry(object):
+    """Collection of metrics"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+        self.metrics = {}
+        self.lock = Lock()
+
+    def counter(self, name, help, labels=(), function=None):
+        return self.register(COUNTER, name, help, labels, function=function)
+
+    def gauge(self, name, help, labels=(), function=None):
+        return self.register(GAUGE, name, help, labels, function=function)
+
+    def histogram(self, name, help, labels=(), buckets=None):
+        return self.register(HISTOGRAM, name, help, labels, buckets=buckets)
+
+    def register(self, type, name, help, labels=(), buckets=None, function=None):
+        if not self.enabled:
+            return NULL_METRIC
+
+        with self.lock:
+            metric = self.metrics.get(name)
+
+            if metric is None:
+                metric = self.metrics[name] = Metric(type, name, help, labels, buckets, function)
+            elif function is not None:
+                # Replace the function (e.g. the source providing the value was restarted)
+                metric.function = function
+
+        return metric
+
+    def collect(self):
+        return dict([
+            (name, metric.samples())
+            for name, metric in sorted(self.metrics.items())
+        ])
+
+    def prometheus(self):
+        lines = []
+
+        for name, metric in sorted(self.metrics.items()):
+            lines.append('# HELP %s %s' % (name, metric.help))
+            lines.append('# TYPE %s %s' % (name, metric.type))
+
+            for values, value in sorted(metric.samples().items()):
+                labels = list(zip(metric.labelnames, values))
+
+                if metric.type != HISTOGRAM:
+                    lines.append('%s%s %s' % (name, format_labels(labels), format_value(value)))
+                    continue
+
+                for bound, count in value['buckets']:
+                    lines.append('%s_bucket%s %s' % (
+                        name, format_labels(labels + [('le', format_value(bound))]), count
+                    ))
+
+                lines.append('%s_sum%s %s' % (name, format_labels(labels), format_value(value['sum'])))
+                lines.append('%s_count%s %s' % (name, format_labels(labels), value['count']))
+
+        return '\n'.join(lines) + '\n'
+
+
+NULL_REGISTRY = Registry(enabled=False)
+
+
+def get_registry(activity):
+    registry = getattr(activity, 'metrics', None)
+
+    if isinstance(registry, Registry):
+        return registry
+
+    return NULL_REGISTRY
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+
+    return '{%s}' % ','.join([
+        '%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    ])
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    if isinstance(value, float):
+        return repr(value)
+
+    return str(value)
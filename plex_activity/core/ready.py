@@ -0,0 +1,90 @@
+from threading import Condition, Lock
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class Ready(object):
+    """Readiness of an activity source (resolved when the source has started, or failed to start)"""
+
+    def __init__(self, name):
+        self.name = name
+
+        self._result = None
+        self._exception = None
+        self._done = False
+
+        self._callbacks = []
+
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+
+    def done(self):
+        return self._done
+
+    def wait(self, timeout=None):
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+
+            return self._done
+
+    def result(self, timeout=None):
+        if not self.wait(timeout):
+            return None
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._result
+
+    def exception(self):
+        return self._exception
+
+    def add_done_callback(self, func):
+        with self._lock:
+            if not self._done:
+                self._callbacks.append(func)
+                return
+
+        self._call(func)
+
+    def set_result(self, result=True):
+        self._resolve(result, None)
+
+    def set_exception(self, exception):
+        self._resolve(None, exception)
+
+    def _resolve(self, result, exception):
+        with self._condition:
+            if self._done:
+                return False
+
+            self._result = result
+            self._exception = exception
+            self._done = True
+
+            callbacks, self._callbacks = self._callbacks, []
+
+            self._condition.notify_all()
+
+        for func in callbacks:
+            self._call(func)
+
+        return True
+
+    def _call(self, func):
+        try:
+            func(self)
+        except Exception as ex:
+            log.warn('Exception raised in ready callback %r: %s', func, ex, exc_info=True)
+
+    def __repr__(self):
+        if not self._done:
+            state = 'pending'
+        elif self._exception is not None:
+            state = 'failed: %s' % self._exception
+        else:
+            state = 'ready' if self._result else 'unavailable'
+
+        return '<Ready %r (%s)>' % (self.name, state)
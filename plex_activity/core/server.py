@@ -0,0 +1,45 @@
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+class Server(object):
+    """Plex Media Server connection details (used to monitor multiple servers from one process)"""
+
+    __slots__ = ('host', 'port', 'token', 'name', 'local')
+
+    def __init__(self, host, port=32400, token=None, name=None, local=None):
+        self.host = host
+        self.port = int(port)
+        self.token = token
+
+        self.name = name or '%s:%s' % (self.host, self.port)
+        self.local = local if local is not None else host in LOCAL_HOSTS
+
+    def tag(self, args):
+        if not args:
+            return {'server': self.name},
+
+        info = args[0]
+
+        if type(info) is dict:
+            info['server'] = self.name
+        elif type(info) is list:
+            for item in info:
+                if type(item) is dict:
+                    item['server'] = self.name
+
+        return args
+
+    @classmethod
+    def parse(cls, value):
+        if isinstance(value, Server):
+            return value
+
+        if isinstance(value, dict):
+            return cls(**value)
+
+        host, _, port = value.partition(':')
+
+        return cls(host, port or 32400)
+
+    def __repr__(self):
+        return '<Server %r (%s:%s)>' % (self.name, self.host, self.port)
@@ -0,0 +1,68 @@
+# Event names (importing this module doesn't load any sources or dependencies)
+
+# Websocket source
+WEBSOCKET_PLAYING = 'websocket.playing'
+
+WEBSOCKET_SCANNER_STARTED = 'websocket.scanner.started'
+WEBSOCKET_SCANNER_PROGRESS = 'websocket.scanner.progress'
+WEBSOCKET_SCANNER_FINISHED = 'websocket.scanner.finished'
+
+WEBSOCKET_TIMELINE_CREATED = 'websocket.timeline.created'
+WEBSOCKET_TIMELINE_MATCHING = 'websocket.timeline.matching'
+WEBSOCKET_TIMELINE_DOWNLOADING = 'websocket.timeline.downloading'
+WEBSOCKET_TIMELINE_LOADING = 'websocket.timeline.loading'
+WEBSOCKET_TIMELINE_FINISHED = 'websocket.timeline.finished'
+WEBSOCKET_TIMELINE_ANALYZING = 'websocket.timeline.analyzing'
+WEBSOCKET_TIMELINE_DELETED = 'websocket.timeline.deleted'
+
+WEBSOCKET_EVENTS = [
+    WEBSOCKET_PLAYING,
+
+    WEBSOCKET_SCANNER_STARTED,
+    WEBSOCKET_SCANNER_PROGRESS,
+    WEBSOCKET_SCANNER_FINISHED,
+
+    WEBSOCKET_TIMELINE_CREATED,
+    WEBSOCKET_TIMELINE_MATCHING,
+    WEBSOCKET_TIMELINE_DOWNLOADING,
+    WEBSOCKET_TIMELINE_LOADING,
+    WEBSOCKET_TIMELINE_FINISHED,
+    WEBSOCKET_TIMELINE_ANALYZING,
+    WEBSOCKET_TIMELINE_DELETED
+]
+
+# Logging source
+LOGGING_PLAYING = 'logging.playing'
+
+LOGGING_ACTION_PLAYED = 'logging.action.played'
+LOGGING_ACTION_UNPLAYED = 'logging.action.unplayed'
+
+LOGGING_EVENTS = [
+    LOGGING_PLAYING,
+
+    LOGGING_ACTION_PLAYED,
+    LOGGING_ACTION_UNPLAYED
+]
+
+# Merged playback stream (see `Activity.merge_playing()`)
+PLAYING = 'playing'
+
+# Session tracker (see `Activity.track_sessions()`)
+SESSION_STARTED = 'session.started'
+SESSION_PAUSED = 'session.paused'
+SESSION_RESUMED = 'session.resumed'
+SESSION_SEEKED = 'session.seeked'
+SESSION_PROGRESS = 'session.progress'
+SESSION_STOPPED = 'session.stopped'
+
+SESSION_EVENTS = [
+    SESSION_STARTED,
+    SESSION_PAUSED,
+    SESSION_RESUMED,
+    SESSION_SEEKED,
+    SESSION_PROGRESS,
+    SESSION_STOPPED
+]
+
+# Server health monitor (see `Activity.health`)
+HEALTH_CHANGED = 'health.changed'
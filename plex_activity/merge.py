@@ -0,0 +1,137 @@
+from plex_activity.core.helpers import get_dispatch, to_int
+from plex_activity.events import PLAYING
+
+from threading import Lock
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+class PlaybackMerger(object):
+    """Emits each playback update once, the first source to report an update is emitted immediately and
+    matching reports from the other source (within :code:`window`) are dropped
+
+    Reports match when the :code:`ratingKey`, client (websocket :code:`clientIdentifier` or logging
+    :code:`machineIdentifier`) and state are equal, and the offsets differ by less than :code:`window`.
+    """
+
+    event = PLAYING
+
+    def __init__(self, activity, window=2):
+        self.activity = activity
+        self.window = window
+
+        # Recently emitted updates, keyed by (server, ratingKey)
+        self.recent = {}
+        self.pruned = time.time()
+
+        self.lock = Lock()
+        self.bound = False
+
+        self.emitted = 0
+        self.merged = 0
+
+    def bind(self):
+        if self.bound:
+            return
+
+        self.activity.on('websocket.playing', self.on_websocket)
+        self.activity.on('logging.playing', self.on_logging)
+
+        self.bound = True
+
+    def unbind(self):
+        if not self.bound:
+            return
+
+        self.activity.off('websocket.playing', self.on_websocket)
+        self.activity.off('logging.playing', self.on_logging)
+
+        self.bound = False
+
+    def on_websocket(self, info):
+        self.update({
+            'source': 'websocket',
+            'server': info.get('server'),
+
+            'ratingKey': info.get('ratingKey'),
+            'client': info.get('clientIdentifier'),
+            'session': info.get('sessionKey'),
+
+            'state': info.get('state'),
+            'offset': to_int(info.get('viewOffset')),
+
+            'timestamp': time.time(),
+            'info': info
+        })
+
+    def on_logging(self, info):
+        self.update({
+            'source': 'logging',
+            'server': info.get('server'),
+
+            'ratingKey': info.get('ratingKey'),
+            'client': info.get('machineIdentifier'),
+            'session': None,
+
+            'state': info.get('state'),
+            'offset': to_int(info.get('time')),
+
+            'timestamp': info.get('timestamp') or time.time(),
+            'info': info
+        })
+
+    def update(self, item):
+        now = time.time()
+        key = (item['server'], item['ratingKey'])
+
+        with self.lock:
+            entries = self.recent.get(key)
+
+            if entries:
+                # Discard expired entries
+                entries = [entry for entry in entries if now - entry[0] <= self.window]
+
+                for entry in entries:
+                    if self.matches(entry[1], item):
+                        entries.remove(entry)
+                        self.recent[key] = entries
+
+                        self.merged += 1
+                        return
+            else:
+                entries = []
+
+            entries.append((now, item))
+            self.recent[key] = entries
+
+            self.emitted += 1
+
+            if now - self.pruned > self.window * 10:
+                self.prune(now)
+
+        get_dispatch(self.activity)(self.event, item)
+
+    def matches(self, previous, item):
+        if previous['source'] == item['source']:
+            # Updates from the same source are never duplicates
+            return False
+
+        if previous['state'] != item['state']:
+            return False
+
+        if previous['client'] and item['client'] and previous['client'] != item['client']:
+            return False
+
+        if previous['offset'] is not None and item['offset'] is not None:
+            return abs(previous['offset'] - item['offset']) <= self.window * 1000
+
+        return True
+
+    def prune(self, now):
+        for key, entries in list(self.recent.items()):
+            if all(now - entry[0] > self.window for entry in entries):
+                del self.recent[key]
+
+        self.pruned = now
@@ -0,0 +1,286 @@
+from plex_activity.core.helpers import get_dispatch, to_int
+from plex_activity.events import SESSION_EVENTS
+
+from threading import Event, Lock, Thread
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+STATE_PLAYING = 'playing'
+STATE_PAUSED = 'paused'
+STATE_BUFFERING = 'buffering'
+STATE_STOPPED = 'stopped'
+
+
+class Session(object):
+    """Compact playback state of a single stream"""
+
+    __slots__ = (
+        'key', 'source', 'server', 'session', 'rating_key', 'client',
+        'state', 'offset', 'updated', 'origin', 'progressed', 'info'
+    )
+
+    def __init__(self, key, source, server, session, rating_key, client):
+        self.key = key
+        self.source = source
+        self.server = server
+
+        self.session = session
+        self.rating_key = rating_key
+        self.client = client
+
+        self.state = None
+        self.offset = None
+
+        # Time the last update was received, and the time it happened (log line time for log events)
+        self.updated = None
+        self.origin = None
+
+        self.progressed = None
+
+        self.info = None
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'server': self.server,
+
+            'session': self.session,
+            'ratingKey': self.rating_key,
+            'client': self.client,
+
+            'state': self.state,
+            'offset': self.offset,
+
+            'info': self.info
+        }
+
+    def __repr__(self):
+        return '<Session %r (%s, offset: %s)>' % (self.key, self.state, self.offset)
+
+
+class SessionTracker(object):
+    """Tracks playback sessions from :code:`websocket.playing` and :code:`logging.playing` events"""
+
+    events = list(SESSION_EVENTS)
+
+    def __init__(self, activity, progress_interval=10, seek_threshold=15, timeout=120):
+        self.activity = activity
+
+        self.progress_interval = progress_interval
+        self.seek_threshold = seek_threshold
+        self.timeout = timeout
+
+        self.sessions = {}
+        self.expired = None
+
+        self.lock = Lock()
+        self.bound = False
+
+        # Expires sessions that stopped without a "stopped" notification
+        self.thread = None
+        self.stopped = Event()
+
+    def bind(self):
+        if self.bound:
+            return
+
+        self.activity.on('websocket.playing', self.on_websocket)
+        self.activity.on('logging.playing', self.on_logging)
+
+        self.stopped.clear()
+
+        self.thread = Thread(target=self.run, name='activity-sessions')
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.bound = True
+
+    def unbind(self):
+        if not self.bound:
+            return
+
+        self.activity.off('websocket.playing', self.on_websocket)
+        self.activity.off('logging.playing', self.on_logging)
+
+        self.stopped.set()
+        self.thread = None
+
+        self.bound = False
+
+    def run(self):
+        while not self.stopped.wait(1):
+            if not self.sessions:
+                continue
+
+            with self.lock:
+                stopped = self.expire(time.time())
+
+            self.emit_expired(stopped)
+
+    def on_websocket(self, info):
+        self.update(
+            'websocket', info.get('server'), info.get('sessionKey'), info.get('ratingKey'), info.get('clientIdentifier'),
+            info.get('state'), info.get('viewOffset'), info.get('received') or time.time(), info
+        )
+
+    def on_logging(self, info):
+        # Same identifier as the websocket `clientIdentifier` (the device name and address never match it)
+        self.update(
+            'logging', info.get('server'), None, info.get('ratingKey'), info.get('machineIdentifier'),
+            info.get('state'), info.get('time'), info.get('received') or time.time(), info
+        )
+
+    def update(self, source, server, session, rating_key, client, state, offset, now, info=None):
+        if rating_key is None:
+            return
+
+        # Both sources report the same playback, so sessions are keyed by the client (not the source)
+        key = (server, client or session, rating_key)
+        offset = to_int(offset)
+
+        # Seeks and progress are measured on the clock of the event (log line time for log events),
+        # expiry on the time events were received
+        origin = (info.get('origin') if info else None) or now
+
+        emit = []
+
+        with self.lock:
+            current = self.sessions.get(key)
+
+            if current is None:
+                current = self.find(server, rating_key, client or session)
+
+                if current is not None:
+                    key = current.key
+
+            if current is None:
+                if state == STATE_STOPPED:
+                    # Stop for an unknown session (e.g. the tracker was started mid-stream)
+                    return
+
+                current = self.sessions[key] = Session(key, source, server, session, rating_key, client)
+
+                emit.append(('session.started', None))
+
+                if state == STATE_PAUSED:
+                    emit.append(('session.paused', None))
+            elif state == STATE_STOPPED:
+                del self.sessions[key]
+
+                emit.append(('session.stopped', None))
+            else:
+                seek = self.is_seek(current, offset, origin)
+
+                if state == STATE_PAUSED and current.state != STATE_PAUSED:
+                    emit.append(('session.paused', None))
+                elif state == STATE_PLAYING and current.state == STATE_PAUSED:
+                    emit.append(('session.resumed', None))
+
+                if seek:
+                    emit.append(('session.seeked', {'previous': current.offset}))
+
+                current.source = source
+
+                if session is not None:
+                    current.session = session
+
+            if state != STATE_BUFFERING or current.state is None:
+                # Buffering doesn't change the playback state
+                current.state = state
+
+            current.offset = offset
+            current.updated = now
+            current.origin = origin
+            current.info = info
+
+            # Throttled progress events
+            if (
+                state == STATE_PLAYING and self.progress_interval is not None and
+                (current.progressed is None or origin - current.progressed >= self.progress_interval)
+            ):
+                current.progressed = origin
+                emit.append(('session.progress', None))
+
+            payload = current.to_dict()
+
+            # Stop sessions that haven't been updated recently
+            stopped = self.expire(now)
+
+        for event, extra in emit:
+            data = dict(payload)
+
+            if extra:
+                data.update(extra)
+
+            self.emit(event, data)
+
+        self.emit_expired(stopped)
+
+    def find(self, server, rating_key, client):
+        # Match updates without a client identifier (e.g. log requests without one) to the tracked stream
+        # of the item, and adopt that stream once its client identifier is known
+        for current in self.sessions.values():
+            if current.server != server or current.rating_key != rating_key:
+                continue
+
+            if client is None:
+                return current
+
+            if current.key[1] is None:
+                del self.sessions[current.key]
+
+                current.key = (server, client, rating_key)
+                current.client = current.client or client
+
+                self.sessions[current.key] = current
+                return current
+
+        return None
+
+    def is_seek(self, current, offset, origin):
+        if self.seek_threshold is None or offset is None or current.offset is None:
+            return False
+
+        expected = current.offset
+
+        if current.state == STATE_PLAYING:
+            expected += (origin - current.origin) * 1000
+
+        return abs(offset - expected) > self.seek_threshold * 1000
+
+    def expire(self, now):
+        if self.timeout is None:
+            return []
+
+        if self.expired is not None and now - self.expired < 1:
+            return []
+
+        self.expired = now
+
+        expired = [
+            session for session in self.sessions.values()
+            if now - session.updated > self.timeout
+        ]
+
+        for session in expired:
+            del self.sessions[session.key]
+
+        return expired
+
+    def emit_expired(self, sessions):
+        for session in sessions:
+            data = session.to_dict()
+            data['reason'] = 'timeout'
+
+            self.emit('session.stopped', data)
+
+    def emit(self, event, info):
+        get_dispatch(self.activity)(event, info)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(list(self.sessions.values()))
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class AsyncSource(object):
+    """Runs a source as a task on the event loop (mixed in before the threaded source class)"""
+
+    task = None
+
+    def start(self):
+        self.task = asyncio.ensure_future(self._run_wrapper())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+            self.task = None
+
+        self.close()
+
+    async def _run_wrapper(self):
+        try:
+            await self.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            log.error('Exception raised in "%s" activity source: %s', self.name, ex, exc_info=True)
+            self.ready.set_exception(ex)
+        finally:
+            # Source stopped without becoming ready
+            self.ready.set_result(False)
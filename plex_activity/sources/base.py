@@ -1,3 +1,6 @@
+from plex_activity.core.helpers import get_dispatch, is_subscribed
+from plex_activity.core.ready import Ready
+
 from pyemitter import Emitter
 from threading import Thread
 import logging
@@ -8,17 +11,72 @@ log = logging.getLogger(__name__)
 class Source(Emitter):
     name = None
 
-    def __init__(self):
+    activity = None
+
+    def __init__(self, server=None):
+        self.server = server
+
+        # Events delivered directly to the activity instance (see `forward()`)
+        self.forwarded = frozenset()
+        self.dispatch = None
+
+        # Time the data being processed was received (live sources only, see `stamp()`)
+        self.received = None
+
         self.thread = Thread(target=self._run_wrapper)
 
+        # Sources are constructed on the (daemon) start threads, keep the process alive while they run
+        self.thread.daemon = False
+
+        # Resolved when the source has started (or failed to start)
+        self.ready = Ready(self.name)
+
     def start(self):
         self.thread.start()
 
+    def emit(self, event, *args, **kwargs):
+        if self.server is not None:
+            # Tag event with the server it was received from
+            args = self.server.tag(args)
+
+        if self.received is not None and args and type(args[0]) is dict:
+            self.stamp(args[0])
+
+        if event in self.forwarded:
+            return self.dispatch(event, *args, **kwargs)
+
+        return super(Source, self).emit(event, *args, **kwargs)
+
+    def stamp(self, info):
+        if 'received' not in info:
+            info['received'] = self.received
+
+        if 'origin' not in info:
+            info['origin'] = info.get('timestamp') or self.received
+
+    def forward(self, events, activity):
+        self.forwarded = self.forwarded.union(events)
+        self.dispatch = get_dispatch(activity)
+
+    def request_health_check(self):
+        # Check the server is still available (on the health monitor thread)
+        health = getattr(self.activity, 'health', None)
+
+        if health is not None:
+            health.request(self.server.name if self.server is not None else None)
+
     def run(self):
         pass
 
+    def subscribed(self, *events):
+        return is_subscribed(self.activity, *events)
+
     def _run_wrapper(self):
         try:
             self.run()
         except Exception as ex:
             log.error('Exception raised in "%s" activity source: %s', self.name, ex, exc_info=True)
+            self.ready.set_exception(ex)
+        finally:
+            # Source stopped without becoming ready
+            self.ready.set_result(False)
@@ -0,0 +1,91 @@
+from plex_activity.sources.aio import AsyncSource
+from plex_activity.sources.s_logging.main import Logging
+
+import asyncio
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+class AsyncLogging(AsyncSource, Logging):
+    """Non-blocking (asyncio) log tailer"""
+
+    # Number of lines processed before yielding to the event loop
+    batch_size = 500
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+
+        # Path discovery requests the server preferences, run it outside the event loop
+        path = await loop.run_in_executor(None, self.get_path)
+        if not path:
+            raise Exception('Unable to find the location of "Plex Media Server.log"')
+
+        line = await self.read_line_async(ping=True, stale_sleep=0.5)
+        if line is None:
+            log.info('Unable to read log file')
+            return
+
+        log.debug('Ready')
+
+        count = 0
+
+        while True:
+            if line is not None:
+                self.received = time.time()
+                self.process(line)
+            else:
+                log.info('Unable to read log file')
+
+            # Yield to other tasks while catching up
+            count += 1
+
+            if count >= self.batch_size:
+                count = 0
+                await asyncio.sleep(0)
+
+            # Grab the next line of the log
+            line = await self.read_line_async(ping=True)
+
+    async def read_line_async(self, timeout=60, ping=False, stale_sleep=1.0):
+        stale_since = None
+
+        while True:
+            line = self.read_line()
+
+            if line is not None:
+                return line
+
+            if stale_since is None:
+                stale_since = time.time()
+
+            delay = self.idle(stale_since, timeout, ping, stale_sleep)
+
+            if delay is None:
+                return None
+
+            if delay:
+                await self.wait_async(delay)
+
+    async def wait_async(self, timeout):
+        fd = getattr(self.watcher, 'fd', None)
+
+        if fd is None:
+            await asyncio.sleep(timeout)
+            return False
+
+        # Wait for the inotify descriptor to become readable
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+
+        loop.add_reader(fd, lambda: future.done() or future.set_result(True))
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fd)
+
+        return self.watcher.read_events()
@@ -0,0 +1,210 @@
+from plex_activity.sources.s_logging.dispatcher import Dispatcher
+from plex_activity.sources.s_logging.reader import LogReader, drain
+from plex_activity.sources.s_logging.tokenizer import tokenize
+
+from pyemitter import Emitter
+import heapq
+import io
+import logging
+import multiprocessing
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+DEFAULT_RANGE_SIZE = 32 * 1024 * 1024
+
+# Maximum number of (log) seconds to read past the end of a range while finishing request blocks
+OVERRUN_TIMEOUT = 5
+
+
+class Collector(Emitter):
+    """Collects the events emitted by parsers (in a worker process)"""
+
+    def __init__(self):
+        self.events = []
+        self.timestamp = None
+
+    def emit(self, event, *args, **kwargs):
+        timestamp = None
+
+        if args and type(args[0]) is dict:
+            timestamp = args[0].get('timestamp')
+
+        if timestamp is None:
+            # Use the time of the previous event
+            timestamp = self.timestamp
+        else:
+            self.timestamp = timestamp
+
+        self.events.append((timestamp or 0, len(self.events), event, args))
+
+
+class RangeFile(object):
+    """File wrapper that stops reading at :code:`end`"""
+
+    def __init__(self, fp, end):
+        self.fp = fp
+        self.end = end
+
+    def read(self, n=-1):
+        remaining = self.end - self.fp.tell()
+
+        if remaining <= 0:
+            return b''
+
+        if n < 0 or n > remaining:
+            n = remaining
+
+        return self.fp.read(n)
+
+
+def split(paths, size=DEFAULT_RANGE_SIZE):
+    ranges = []
+
+    for path in paths:
+        total = os.path.getsize(path)
+        start = 0
+
+        with io.open(path, 'rb') as fp:
+            while start < total:
+                end = start + size
+
+                if end >= total:
+                    end = total
+                else:
+                    # Move boundary to the start of the next line
+                    fp.seek(end)
+                    fp.readline()
+
+                    end = fp.tell()
+
+                ranges.append((path, start, end))
+                start = end
+
+    return ranges
+
+
+def process_range(path, start, end, parsers):
+    # Lines in [start, end) are processed normally, request blocks still in-flight at `end` are finished
+    # by reading past the end of the range (new blocks aren't started there, they belong to the next range)
+    collector = Collector()
+    dispatcher = Dispatcher([p(collector) for p in parsers])
+
+    lines = 0
+
+    with io.open(path, 'rb') as fp:
+        fp.seek(start)
+
+        # Process lines in range
+        reader = LogReader(RangeFile(fp, end))
+
+        for batch in drain(reader):
+            for line in batch:
+                dispatch(dispatcher, line)
+
+            lines += len(batch)
+
+        # Finish in-flight request blocks
+        if dispatcher.pending():
+            overrun(fp, dispatcher)
+
+        dispatcher.flush()
+
+    return collector.events, lines, end - start
+
+
+def dispatch(dispatcher, line):
+    record = tokenize(line)
+
+    if record is None:
+        return
+
+    try:
+        dispatcher.dispatch(record)
+    except Exception as ex:
+        # Don't let a broken parser fail the whole range
+        log.warn('Unable to process line %r: %s', line, ex, exc_info=True)
+
+
+def overrun(fp, dispatcher):
+    reader = LogReader(fp)
+    started = None
+
+    while dispatcher.pending():
+        line = reader.read_line()
+
+        if line is None:
+            break
+
+        record = tokenize(line)
+
+        if record is None:
+            continue
+
+        # Stop once the remaining blocks have gone quiet
+        timestamp = record.timestamp
+
+        if started is None:
+            started = timestamp
+        elif timestamp is not None and started is not None and timestamp - started > OVERRUN_TIMEOUT:
+            break
+
+        for parser in dispatcher.stateful:
+            if record.thread not in parser.blocks:
+                continue
+
+            try:
+                parser.continue_block(record)
+            except Exception as ex:
+                log.warn('Unable to process line %r: %s', line, ex, exc_info=True)
+
+
+def _process_range(args):
+    return process_range(*args)
+
+
+def backfill(paths, parsers, callback, processes=None, size=DEFAULT_RANGE_SIZE):
+    started = time.time()
+
+    ranges = split(paths, size)
+    tasks = [(path, start, end, parsers) for (path, start, end) in ranges]
+
+    log.debug('Backfilling %d file(s) in %d range(s)', len(paths), len(ranges))
+
+    pool = multiprocessing.Pool(processes)
+
+    try:
+        results = pool.map(_process_range, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    stats = {
+        'files': len(paths),
+        'ranges': len(ranges),
+        'lines': sum(lines for (_, lines, _) in results),
+        'bytes': sum(size for (_, _, size) in results),
+        'events': 0
+    }
+
+    # Merge events (in timestamp order, ties are kept in file order)
+    streams = [
+        sorted((timestamp, x, seq, event, args) for (timestamp, seq, event, args) in events)
+        for x, (events, _, _) in enumerate(results)
+    ]
+
+    for _, _, _, event, args in heapq.merge(*streams):
+        callback(event, *args)
+        stats['events'] += 1
+
+    stats['elapsed'] = time.time() - started
+
+    if stats['elapsed'] > 0:
+        stats['lines_per_second'] = stats['lines'] / stats['elapsed']
+        stats['bytes_per_second'] = stats['bytes'] / stats['elapsed']
+    else:
+        stats['lines_per_second'] = None
+        stats['bytes_per_second'] = None
+
+    return stats
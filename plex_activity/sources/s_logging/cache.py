@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+import re
+import time
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+def get_cache_directory():
+    system = platform.system()
+
+    if system == 'Windows':
+        base = os.getenv('LOCALAPPDATA') or os.getenv('APPDATA')
+    elif system == 'Darwin':
+        base = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    if not base:
+        return None
+
+    return os.path.join(base, 'plex.activity')
+
+
+class JSONCache(object):
+    """JSON file in the user cache directory"""
+
+    def __init__(self, name, location=None):
+        if location is None:
+            directory = get_cache_directory()
+
+            if directory:
+                location = os.path.join(directory, name)
+
+        self.location = location
+
+    def read(self):
+        if not self.location:
+            return None
+
+        try:
+            with open(self.location, 'r') as fp:
+                data = json.load(fp)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return None
+
+        return data
+
+    def write(self, data):
+        if not self.location:
+            return False
+
+        data = dict(data, version=CACHE_VERSION)
+
+        try:
+            directory = os.path.dirname(self.location)
+
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            # Write to a temporary file, then replace the cache (so readers never see a partial file)
+            temp = '%s.%d.tmp' % (self.location, os.getpid())
+
+            with open(temp, 'w') as fp:
+                json.dump(data, fp)
+
+            replace = getattr(os, 'replace', None)
+
+            if replace is None and os.path.exists(self.location):
+                os.remove(self.location)
+
+            (replace or os.rename)(temp, self.location)
+        except (IOError, OSError) as ex:
+            log.debug('Unable to write the cache to %r: %s', self.location, ex)
+            return False
+
+        return True
+
+    def clear(self):
+        if not self.location or not os.path.exists(self.location):
+            return
+
+        try:
+            os.remove(self.location)
+        except (IOError, OSError) as ex:
+            log.debug('Unable to remove the cache %r: %s', self.location, ex)
+
+
+class PathCache(JSONCache):
+    """Persistent cache of the discovered "Plex Media Server.log" path
+
+    A cached path is only used if it still exists as a regular file and its directory is the same
+    directory (device and inode) that was cached, otherwise the path is rediscovered. The log file
+    itself is replaced on each rotation, so its inode isn't compared.
+    """
+
+    def __init__(self, location=None):
+        super(PathCache, self).__init__('log-path.json', location)
+
+    def load(self):
+        data = self.read()
+
+        if data is None:
+            return None
+
+        path = data.get('path')
+
+        if not path or not self.validate(path, data.get('directory')):
+            log.debug('Cached log path %r is no longer valid', path)
+            return None
+
+        return path
+
+    def save(self, path):
+        identity = get_identity(os.path.dirname(path))
+
+        if identity is None:
+            return False
+
+        return self.write({
+            'path': path,
+            'directory': identity
+        })
+
+    def validate(self, path, identity):
+        if not os.path.isfile(path):
+            return False
+
+        return identity is not None and get_identity(os.path.dirname(path)) == identity
+
+
+class Checkpoint(object):
+    """Persistent read position in "Plex Media Server.log"
+
+    The position is stored with the identity (device and inode) of the file, so it can be found again
+    after the file has been rotated (renamed to "Plex Media Server.1.log").
+
+    Each log path has its own checkpoint file, :code:`consumer` separates the checkpoints of
+    applications reading the same log.
+    """
+
+    def __init__(self, directory=None, consumer=None):
+        self.directory = directory if directory is not None else get_cache_directory()
+        self.consumer = consumer
+
+        self._caches = {}
+
+    def load(self, path):
+        data = self.get_cache(path).read()
+
+        if data is None or data.get('path') != path:
+            return None
+
+        if data.get('identity') is None or data.get('offset') is None:
+            return None
+
+        return data
+
+    def save(self, path, identity, offset):
+        if identity is None:
+            return False
+
+        return self.get_cache(path).write({
+            'path': path,
+            'identity': list(identity),
+            'offset': offset,
+            'time': time.time()
+        })
+
+    def clear(self, path):
+        self.get_cache(path).clear()
+
+    def get_cache(self, path):
+        cache = self._caches.get(path)
+
+        if cache is None:
+            name = self.get_name(path)
+            cache = self._caches[path] = JSONCache(name, os.path.join(self.directory, name) if self.directory else None)
+
+        return cache
+
+    def get_name(self, path):
+        if not isinstance(path, bytes):
+            path = path.encode('utf-8')
+
+        name = 'log-offset-%s' % hashlib.sha1(path).hexdigest()[:16]
+
+        if self.consumer:
+            name += '-' + re.sub(r'[^\w.-]+', '_', self.consumer)
+
+        return name + '.json'
+
+
+def get_identity(path):
+    try:
+        stat = os.fstat(path) if isinstance(path, int) else os.stat(path)
+    except (IOError, OSError):
+        return None
+
+    # JSON stores tuples as lists
+    return [stat.st_dev, stat.st_ino]
@@ -0,0 +1,92 @@
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class Dispatcher(object):
+    """Routes log lines to the parser that can match them.
+
+    The dispatch table is built once from the :code:`keywords` declared by each parser, lines that don't
+    contain any keyword are rejected with a substring check before any regular expressions are run.
+
+    Parsers that don't declare any keywords are tried (in order) for every line that wasn't claimed,
+    parsers that don't set :code:`tokenized` are given the raw line.
+
+    Lines written by a thread with an in-flight request block are offered to the parser that owns the
+    block first, so interleaved requests are each read from their own thread.
+    """
+
+    def __init__(self, parsers):
+        self.parsers = parsers
+
+        self.keywords = []
+        self.fallback = []
+
+        # Parsers that track request blocks
+        self.stateful = [parser for parser in parsers if getattr(parser, 'blocks', None) is not None]
+
+        self.build()
+
+    def build(self):
+        table = {}
+        order = []
+
+        for parser in self.parsers:
+            keywords = getattr(parser, 'keywords', None)
+
+            if not keywords:
+                self.fallback.append(parser)
+                continue
+
+            for keyword in keywords:
+                # Parser patterns are case-insensitive, so keywords are matched against lower-cased lines
+                keyword = keyword.lower()
+
+                if keyword not in table:
+                    table[keyword] = []
+                    order.append(keyword)
+
+                table[keyword].append(parser)
+
+        self.keywords = [(keyword, table[keyword]) for keyword in order]
+
+        log.debug(
+            'Built dispatch table with %d keyword(s) and %d fallback parser(s)',
+            len(self.keywords), len(self.fallback)
+        )
+
+    def dispatch(self, line):
+        # Continue in-flight request blocks
+        for parser in self.stateful:
+            if parser.blocks and line.thread in parser.blocks and parser.continue_block(line):
+                parser.metric_matched.inc()
+                return True
+
+        message = line.message.lower() if self.keywords else line.message
+
+        for keyword, parsers in self.keywords:
+            if keyword not in message:
+                continue
+
+            for parser in parsers:
+                if parser.process(line if parser.tokenized else line.line):
+                    parser.metric_matched.inc()
+                    return True
+
+        for parser in self.fallback:
+            if parser.process(line if parser.tokenized else line.line):
+                parser.metric_matched.inc()
+                return True
+
+        return False
+
+    def pending(self):
+        return sum(len(parser.blocks) for parser in self.stateful)
+
+    def expire(self, timeout):
+        for parser in self.stateful:
+            parser.expire(timeout)
+
+    def flush(self):
+        for parser in self.stateful:
+            parser.flush()
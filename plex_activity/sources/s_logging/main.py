@@ -1,11 +1,19 @@
 from plex import Plex
+from plex_activity.core.metrics import get_registry
+from plex_activity.events import LOGGING_EVENTS
 from plex_activity.sources.base import Source
+from plex_activity.sources.s_logging import backfill
+from plex_activity.sources.s_logging.cache import Checkpoint, PathCache, get_identity
+from plex_activity.sources.s_logging.dispatcher import Dispatcher
 from plex_activity.sources.s_logging.parsers import NowPlayingParser, ScrobbleParser
+from plex_activity.sources.s_logging.reader import LogReader, drain
+from plex_activity.sources.s_logging.tokenizer import tokenize
+from plex_activity.sources.s_logging.watcher import create_watcher
 
 from asio import ASIO
 from asio.file import SEEK_ORIGIN_CURRENT
-from io import BufferedReader
 import inspect
+import io
 import logging
 import os
 import platform
@@ -42,110 +50,413 @@ PATH_HINTS = {
 
 class Logging(Source):
     name = 'logging'
-    events = [
-        'logging.playing',
-        'logging.action.played',
-        'logging.action.unplayed'
-    ]
+    events = list(LOGGING_EVENTS)
 
     parsers = []
 
     path = None
     path_hints = PATH_HINTS
 
-    def __init__(self, activity):
-        super(Logging, self).__init__()
+    # Persistent cache of the discovered log path (set to `None` to always discover the path)
+    path_cache = PathCache()
+
+    # Use inotify to wait for log changes (if available), otherwise poll
+    inotify = True
+
+    # Seconds to wait for more lines from a thread before finishing its request block
+    block_timeout = 5
+
+    # Persistent read position, used to resume after restarts (set to `None` to start reading from
+    # the end of the log, or use `Checkpoint(consumer=...)` when several applications read the same log)
+    checkpoint = Checkpoint()
+
+    # Minimum number of seconds between checkpoint updates
+    checkpoint_interval = 5
+
+    # Checkpoints older than this (in seconds) are ignored
+    checkpoint_max_age = 24 * 60 * 60
+
+    def __init__(self, activity, server=None):
+        super(Logging, self).__init__(server)
+
+        self.activity = activity
+
+        # Metrics
+        registry = get_registry(activity)
+
+        self.metric_lines = registry.counter('plex_activity_log_lines_total', 'Log lines read').labels()
+        self.metric_bytes = registry.counter('plex_activity_log_bytes_total', 'Log bytes read').labels()
+
+        self.metrics = registry
 
         self.parsers = [p(self) for p in Logging.parsers]
 
+        # Dispatcher for the parsers that have subscribers, rebuilt when the activity subscriptions change
+        self.dispatcher = None
+        self.dispatcher_version = None
+
+        self.update_dispatcher()
+
         self.file = None
         self.reader = None
+        self.watcher = None
 
         self.path = None
 
-        # Pipe events to the main activity instance
-        self.pipe(self.events, activity)
+        # Identity (device and inode) of the open file, and the offset the reader started at
+        self.identity = None
+        self.offset = 0
+
+        self.checkpointed = None
+
+        # Start of the stale period a health check was last requested for (see `idle()`)
+        self.health_requested = None
+
+        # Reading lines written while we weren't running (see `resume()`)
+        self.catching_up = False
+        self.catching_up_since = None
+
+        # Forward events to the main activity instance
+        self.forward(self.events, activity)
 
     def run(self):
         line = self.read_line_retry(ping=True, stale_sleep=0.5)
-        if not line:
+        if line is None:
             log.info('Unable to read log file')
             return
 
         log.debug('Ready')
 
         while True:
-            # Grab the next line of the log
-            line = self.read_line_retry(ping=True)
-
-            if line:
+            if line is not None:
+                self.received = time.time()
                 self.process(line)
             else:
                 log.info('Unable to read log file')
 
+            # Grab the next line of the log
+            line = self.read_line_retry(ping=True)
+
     def process(self, line):
-        for parser in self.parsers:
-            if parser.process(line):
-                return True
+        self.metric_lines.inc()
 
-        return False
+        if self.dispatcher_version != getattr(self.activity, 'subscriptions_version', None):
+            self.update_dispatcher()
 
-    def read_line(self):
-        if not self.file:
+        # Skip lines when nobody is listening for any parser events
+        if not self.dispatcher.parsers:
+            return False
+
+        record = tokenize(line)
+
+        if record is None:
+            return False
+
+        try:
+            return self.dispatcher.dispatch(record)
+        except Exception as ex:
+            # Don't let a broken parser stop the tailer
+            log.warn('Unable to process line %r: %s', line, ex, exc_info=True)
+            return False
+
+    def update_dispatcher(self):
+        parsers = [
+            parser for parser in self.parsers
+            if not getattr(parser, 'events', None) or self.subscribed(*parser.events)
+        ]
+
+        # Finish request blocks of parsers that are no longer active
+        if self.dispatcher:
+            for parser in self.dispatcher.stateful:
+                if parser not in parsers:
+                    parser.flush()
+
+        self.dispatcher = Dispatcher(parsers)
+        self.dispatcher_version = getattr(self.activity, 'subscriptions_version', None)
+
+    def replay(self, paths=None):
+        if paths is None:
             path = self.get_path()
             if not path:
                 raise Exception('Unable to find the location of "Plex Media Server.log"')
 
-            # Open file
-            self.file = ASIO.open(path, opener=False)
-            self.file.seek(self.file.get_size(), SEEK_ORIGIN_CURRENT)
+            paths = self.get_rotated_paths(path)
+
+        stats = {
+            'files': 0,
+            'lines': 0,
+            'bytes': 0
+        }
+
+        started = time.time()
+
+        for path in paths:
+            log.debug('Replaying "%s"', path)
+
+            with io.open(path, 'rb') as fp:
+                reader = LogReader(fp, counter=self.metric_bytes)
+
+                stats['lines'] += self.drain(reader, live=False)
+                stats['files'] += 1
+                stats['bytes'] += reader.bytes_read
+
+        stats['elapsed'] = time.time() - started
+
+        if stats['elapsed'] > 0:
+            stats['lines_per_second'] = stats['lines'] / stats['elapsed']
+            stats['bytes_per_second'] = stats['bytes'] / stats['elapsed']
+        else:
+            stats['lines_per_second'] = None
+            stats['bytes_per_second'] = None
+
+        log.info(
+            'Replayed %d line(s) from %d file(s) in %.2f seconds (%s lines/sec)',
+            stats['lines'], stats['files'], stats['elapsed'],
+            ('%.0f' % stats['lines_per_second']) if stats['lines_per_second'] else '?'
+        )
+
+        return stats
+
+    def read_line(self):
+        if not self.file:
+            self.open()
+        elif not self.reader.lines and self.checkpoint is not None:
+            # Every buffered line has been processed, update the checkpoint
+            self.update_checkpoint()
+
+        line = self.reader.read_line()
+
+        if line is None and self.catching_up:
+            log.info('Caught up with "%s" in %.2f seconds', self.path, time.time() - self.catching_up_since)
+
+            self.catching_up = False
+            self.update_checkpoint(force=True)
+
+        return line
+
+    def open(self, offset=None):
+        path = self.get_path()
+        if not path:
+            raise Exception('Unable to find the location of "Plex Media Server.log"')
+
+        # Open file
+        self.file = ASIO.open(path, opener=False)
+
+        self.path = self.file.get_path()
+        self.identity = get_identity(getattr(self.file, 'fd', None) or self.path)
+
+        log.info('Opened file path: "%s"' % self.path)
+
+        # Resume from the checkpoint (otherwise start reading from the end of the file)
+        size = self.file.get_size()
+
+        self.offset = self.resume(self.path, size) if offset is None else min(offset, size)
+        self.file.seek(self.offset, SEEK_ORIGIN_CURRENT)
+
+        if offset is None and self.offset < size:
+            log.info('Resuming "%s" from offset %d (%d bytes behind)', self.path, self.offset, size - self.offset)
+
+            self.catching_up = True
+            self.catching_up_since = time.time()
+
+        # Create chunked line reader
+        self.reader = LogReader(self.file, counter=self.metric_bytes)
+
+        # Lag metrics
+        self.metrics.gauge('plex_activity_log_lag_bytes', 'Log bytes waiting to be read', function=self.get_lag)
+        self.metrics.gauge('plex_activity_log_catching_up', 'Reading lines written while stopped', function=lambda: int(self.catching_up))
+
+        # Watch for changes to the log file
+        self.watcher = create_watcher(self.path, inotify=self.inotify)
+        log.debug('Waiting for changes with the "%s" watcher', self.watcher.name)
+
+        self.ready.set_result(True)
+
+    def is_rotated(self):
+        try:
+            stat = os.stat(self.path)
+        except (IOError, OSError):
+            # File has been moved, but the new file hasn't been created yet
+            return False
+
+        if [stat.st_dev, stat.st_ino] != self.identity:
+            return True
+
+        return stat.st_size < self.get_position()
+
+    def rotate(self):
+        log.info('Log file "%s" has been rotated, switching to the new file', self.path)
+
+        if self.reader is not None:
+            # Process the rest of the old file
+            self.drain(self.reader)
+
+        self.close()
 
-            # Create buffered reader
-            self.reader = BufferedReader(self.file)
+        # Read the new file from the start (not catching up, the new file has just been created)
+        self.open(offset=0)
 
-            self.path = self.file.get_path()
-            log.info('Opened file path: "%s"' % self.path)
+    def drain(self, reader, live=True):
+        count = 0
 
-        return self.reader.readline()
+        for lines in drain(reader):
+            if live:
+                self.received = time.time()
+
+            for line in lines:
+                self.process(line)
+
+            count += len(lines)
+
+        # File won't be written to again, finish any request blocks
+        self.dispatcher.flush()
+
+        return count
+
+    def resume(self, path, size):
+        checkpoint = self.checkpoint.load(path) if self.checkpoint is not None else None
+
+        if checkpoint is None:
+            return size
+
+        if self.checkpoint_max_age is not None and time.time() - (checkpoint.get('time') or 0) > self.checkpoint_max_age:
+            log.info('Checkpoint has expired, reading from the end of "%s"', path)
+            return size
+
+        identity, offset = checkpoint['identity'], checkpoint['offset']
+
+        if identity == self.identity:
+            if offset > size:
+                log.info('Log file has been truncated, reading "%s" from the start', path)
+                return 0
+
+            return offset
+
+        # File has been rotated since the checkpoint, catch up with the rotated files (oldest first)
+        rotated = self.get_rotated_paths(path)[:-1]
+
+        for x, candidate in enumerate(rotated):
+            if get_identity(candidate) != identity:
+                continue
+
+            self.catch_up([(candidate, offset)] + [(p, 0) for p in rotated[x + 1:]])
+            return 0
+
+        log.warn('Unable to find the checkpoint file (rotated out?), reading "%s" from the start', path)
+        return 0
+
+    def catch_up(self, files):
+        started = time.time()
+
+        for path, offset in files:
+            log.info('Catching up with "%s" from offset %d', path, offset)
+
+            with io.open(path, 'rb') as fp:
+                # Identity of the opened file (the path may be rotated again while we're reading it)
+                identity = get_identity(fp.fileno())
+
+                fp.seek(offset)
+
+                reader = LogReader(fp, counter=self.metric_bytes)
+                self.drain(reader)
+
+                if self.checkpoint is not None:
+                    self.checkpoint.save(self.path, identity, offset + reader.bytes_read)
+
+        log.info('Caught up with %d rotated file(s) in %.2f seconds', len(files), time.time() - started)
+
+    def update_checkpoint(self, force=False):
+        if self.checkpoint is None or self.reader is None or self.identity is None:
+            return False
+
+        if not force and self.checkpointed is not None and time.time() - self.checkpointed < self.checkpoint_interval:
+            return False
+
+        # Only store positions between request blocks (so resuming never splits a block)
+        if self.reader.lines or self.dispatcher.pending():
+            return False
+
+        self.checkpointed = time.time()
+
+        return self.checkpoint.save(self.path, self.identity, self.get_position())
+
+    def get_position(self):
+        if self.reader is None:
+            return self.offset
+
+        return self.offset + self.reader.bytes_read - len(self.reader.remainder)
+
+    def get_lag(self):
+        if self.file is None or self.reader is None:
+            return 0
+
+        try:
+            return max(self.file.get_size() - self.get_position(), 0)
+        except Exception:
+            return 0
 
     def read_line_retry(self, timeout=60, ping=False, stale_sleep=1.0):
-        line = None
         stale_since = None
 
-        while not line:
+        while True:
             line = self.read_line()
 
-            if line:
-                stale_since = None
-                time.sleep(0.05)
-                break
+            if line is not None:
+                return line
 
             if stale_since is None:
                 stale_since = time.time()
-                time.sleep(stale_sleep)
-                continue
-            elif (time.time() - stale_since) > timeout:
+
+            delay = self.idle(stale_since, timeout, ping, stale_sleep)
+
+            if delay is None:
                 return None
-            elif (time.time() - stale_since) > timeout / 2:
-                # Nothing returned for 5 seconds
-                if self.file.get_path() != self.path:
-                    log.debug("Log file moved (probably rotated), closing")
-                    self.close()
-                elif ping:
-                    # Ping server to see if server is still active
-                    Plex.detail()
-                    ping = False
-
-            time.sleep(stale_sleep)
 
-        return line
+            if delay:
+                self.wait(delay)
+
+    def idle(self, stale_since, timeout, ping, stale_sleep):
+        # Returns the number of seconds to wait for changes, or `None` once the log has been stale for `timeout`
+        stale = time.time() - stale_since
+
+        if stale > timeout:
+            return None
+
+        if ping and stale > timeout / 2 and self.health_requested != stale_since:
+            # Nothing read for a while, check the server is still active (on the health monitor thread)
+            self.request_health_check()
+            self.health_requested = stale_since
+
+        # Finish any request blocks that have gone quiet
+        self.dispatcher.expire(self.block_timeout)
+
+        # Switch to the new file as soon as the log is rotated (the old file has been read to the end)
+        if self.file and self.is_rotated():
+            self.rotate()
+            return 0
+
+        return stale_sleep
+
+    def wait(self, timeout):
+        if not self.watcher:
+            time.sleep(timeout)
+            return False
+
+        return self.watcher.wait(timeout)
 
     def close(self):
+        # Store the final read position
+        self.update_checkpoint(force=True)
+
+        if self.watcher:
+            self.watcher.close()
+            self.watcher = None
+
         if not self.file:
             return
 
         try:
-            # Close the buffered reader
+            # Close the line reader
             self.reader.close()
         except Exception as ex:
             log.error('reader.close() - raised exception: %s', ex, exc_info=True)
@@ -171,6 +482,14 @@ class Logging(Source):
         if cls.path:
             return cls.path
 
+        # Use the cached path (if it's still valid), skips the server preferences request and hint scan
+        if cls.path_cache is not None:
+            cls.path = cls.path_cache.load()
+
+            if cls.path:
+                log.debug('Using the cached path: %r', cls.path)
+                return cls.path
+
         hints = cls.get_hints()
 
         log.debug('hints: %r', hints)
@@ -188,6 +507,9 @@ class Logging(Source):
 
         if cls.path:
             log.debug('Using the path: %r', cls.path)
+
+            if cls.path_cache is not None:
+                cls.path_cache.save(cls.path)
         else:
             log.error('Unable to find a valid path for "Plex Media Server.log"', extra={
                 'data': {
@@ -197,6 +519,41 @@ class Logging(Source):
 
         return cls.path
 
+    def backfill(self, paths=None, processes=None, size=backfill.DEFAULT_RANGE_SIZE):
+        # Parsers are instantiated in the worker processes, parsers registered at runtime are only
+        # available to the workers on platforms that fork
+        if paths is None:
+            path = self.get_path()
+            if not path:
+                raise Exception('Unable to find the location of "Plex Media Server.log"')
+
+            paths = self.get_rotated_paths(path)
+
+        stats = backfill.backfill(paths, Logging.parsers, self.emit, processes=processes, size=size)
+
+        log.info(
+            'Backfilled %d line(s) from %d file(s) in %.2f seconds (%s lines/sec)',
+            stats['lines'], stats['files'], stats['elapsed'],
+            ('%.0f' % stats['lines_per_second']) if stats['lines_per_second'] else '?'
+        )
+
+        return stats
+
+    @classmethod
+    def get_rotated_paths(cls, path, count=5):
+        base, ext = os.path.splitext(path)
+
+        paths = []
+
+        for x in range(count, 0, -1):
+            rotated = '%s.%d%s' % (base, x, ext)
+
+            if os.path.exists(rotated):
+                paths.append(rotated)
+
+        paths.append(path)
+        return paths
+
     @classmethod
     def add_hint(cls, path, system=None):
         if system not in cls.path_hints:
@@ -207,10 +564,10 @@ class Logging(Source):
     @classmethod
     def get_hints(cls):
         # Retrieve system hints
-        hints_system = PATH_HINTS.get(platform.system(), [])
+        hints_system = cls.path_hints.get(platform.system(), [])
 
-        # Retrieve global hints
-        hints_global = PATH_HINTS.get(None, [])
+        # Retrieve global hints (copied, so the server hint isn't added to the registered hints)
+        hints_global = list(cls.path_hints.get(None, []))
 
         # Retrieve hint from server preferences (if available)
         data_path = Plex[':/prefs'].get('LocalAppDataPath')
@@ -1,14 +1,20 @@
 from plex.lib.six.moves import urllib_parse as urlparse
-from plex_activity.core.helpers import str_format
+from plex_activity.core.helpers import LazyRegex, is_subscribed, str_format
+from plex_activity.core.metrics import get_registry, timer
 
 from pyemitter import Emitter
 import logging
 import re
+import time
 
 log = logging.getLogger(__name__)
 
+# Patterns matched against raw log lines (by parsers that don't set `tokenized`)
 LOG_PATTERN = r'^.*?\[\w+\]\s\w+\s-\s{message}$'
-REQUEST_HEADER_PATTERN = str_format(LOG_PATTERN, message=r"Request: (\[(?P<address>.*?):(?P<port>\d+)\]\s)?{method} {path}.*?")
+
+# Patterns are matched against the message of tokenized log lines (see `LogLine`)
+MESSAGE_PATTERN = r'^{message}$'
+REQUEST_HEADER_PATTERN = str_format(MESSAGE_PATTERN, message=r"Request: (\[(?P<address>.*?):(?P<port>\d+)\]\s)?{method} {path}.*?")
 
 IGNORE_PATTERNS = [
     r'error parsing allowedNetworks.*?',
@@ -23,50 +29,168 @@ IGNORE_PATTERNS = [
     r'Received transcode session ping for session .*?'
 ]
 
-IGNORE_REGEX = re.compile(str_format(LOG_PATTERN, message='(%s)' % ('|'.join('(%s)' % x for x in IGNORE_PATTERNS))), re.IGNORECASE)
+IGNORE_REGEX = LazyRegex(lambda: str_format(MESSAGE_PATTERN, message='(%s)' % ('|'.join('(%s)' % x for x in IGNORE_PATTERNS))), re.IGNORECASE)
+
+
+PARAM_REGEX = LazyRegex(str_format(MESSAGE_PATTERN, message=r' \* (?P<key>.*?) =\> (?P<value>.*?)'), re.IGNORECASE)
+
+
+class Block(object):
+    """In-flight request block (header line, followed by parameter lines written by the same thread)"""
+
+    __slots__ = ('line', 'header', 'type', 'regexes', 'info', 'created', 'updated', 'elapsed')
 
+    def __init__(self, line, header, type, regexes):
+        self.line = line
+        self.header = header
+        self.type = type
+        self.regexes = regexes
 
-PARAM_REGEX = re.compile(str_format(LOG_PATTERN, message=r' \* (?P<key>.*?) =\> (?P<value>.*?)'), re.IGNORECASE)
+        self.info = {}
+
+        self.created = time.time()
+        self.updated = self.created
+
+        # Time spent parsing the block (excluding the lines of other threads, and event callbacks)
+        self.elapsed = 0.0
 
 
 class Parser(Emitter):
+    # Literal substrings that must appear in a line for this parser to match it (used to build the
+    # dispatch table), parsers without keywords are tried for every line
+    keywords = None
+
+    # Parsers that set this receive tokenized `LogLine` records in `process()`, otherwise the raw line
+    tokenized = False
+
+    # Name used in metric labels
+    name = None
+
     def __init__(self, core):
         self.core = core
 
-    def read_parameters(self, *match_functions):
-        match_functions = [self.parameter_match] + list(match_functions)
+        # In-flight request blocks, keyed by log thread
+        self.blocks = {}
+
+        # Time spent emitting events (excluded from the block parse time)
+        self.emitting = 0.0
+
+        # Metrics
+        registry = get_registry(getattr(core, 'activity', None))
+        name = self.name or self.__class__.__name__
+
+        self.metric_matched = registry.counter(
+            'plex_activity_parser_lines_total', 'Log lines matched by each parser', ['parser']
+        ).labels(name)
+
+        self.metric_ignored = registry.counter(
+            'plex_activity_parser_ignored_total', 'Log lines skipped by the ignore patterns', ['parser']
+        ).labels(name)
+
+        self.metric_blocks = registry.histogram(
+            'plex_activity_parser_block_seconds', 'Time spent parsing each request block', ['parser']
+        ).labels(name)
+
+    def emit(self, event, *args, **kwargs):
+        # Deliver events directly to the source (instead of piping them through this emitter)
+        started = timer()
+
+        try:
+            return self.core.emit(event, *args, **kwargs)
+        finally:
+            self.emitting += timer() - started
+
+    def subscribed(self, *events):
+        return is_subscribed(getattr(self.core, 'activity', None), *events)
+
+    def open_block(self, line, header, type, regexes=None):
+        if line.thread in self.blocks:
+            self.close_block(line.thread)
 
-        info = {}
+        started = timer()
 
-        while True:
-            line = self.core.read_line_retry(timeout=5)
-            if not line:
-                log.info('Unable to read log file')
-                return {}
+        block = Block(line, header, type, regexes or [])
 
-            # Run through each match function to find a result
-            match = None
-            for func in match_functions:
-                match = func(line)
+        self.blocks[line.thread] = block
+
+        block.elapsed = timer() - started
+        return block
+
+    def continue_block(self, line):
+        # Returns `False` if the line doesn't belong to the block (the block is finished)
+        block = self.blocks.get(line.thread)
+
+        if block is None:
+            return False
+
+        started = timer()
+        message = line.message
+
+        # Run through each pattern to find a result
+        match = self.parameter_match(message)
+
+        if match is None:
+            for regex in block.regexes:
+                match = self.regex_match(regex, message)
 
                 if match is not None:
                     break
 
-            # Update info dict with result, otherwise finish reading
-            if match:
-                info.update(match)
-            elif match is None and IGNORE_REGEX.match(line.strip()) is None:
-                log.debug('break on "%s"', line.strip())
-                break
+        # Update block with result, otherwise finish the block
+        if match:
+            block.info.update(match)
+        elif match is None:
+            if IGNORE_REGEX.match(message) is None:
+                log.debug('break on "%s"', message)
+
+                block.elapsed += timer() - started
+
+                self.close_block(line.thread)
+                return False
+
+            self.metric_ignored.inc()
+
+        block.updated = time.time()
+        block.elapsed += timer() - started
+        return True
+
+    def close_block(self, thread):
+        block = self.blocks.pop(thread, None)
+
+        if block is None:
+            return
+
+        started = timer()
+        self.emitting = 0.0
+
+        self.finish(block)
+
+        block.elapsed += timer() - started - self.emitting
+        self.metric_blocks.observe(block.elapsed)
+
+    def expire(self, timeout):
+        if not self.blocks:
+            return
+
+        expired_before = time.time() - timeout
+
+        for thread, block in list(self.blocks.items()):
+            if block.updated < expired_before:
+                self.close_block(thread)
+
+    def flush(self):
+        for thread in list(self.blocks.keys()):
+            self.close_block(thread)
 
-        return info
+    def finish(self, block):
+        pass
 
     def process(self, line):
         raise NotImplementedError()
 
     @staticmethod
-    def parameter_match(line):
-        match = PARAM_REGEX.match(line.strip())
+    def parameter_match(message):
+        match = PARAM_REGEX.match(message)
         if not match:
             return None
 
@@ -75,8 +199,8 @@ class Parser(Emitter):
         return {match['key']: match['value']}
 
     @staticmethod
-    def regex_match(regex, line):
-        match = regex.match(line.strip())
+    def regex_match(regex, message):
+        match = regex.match(message)
         if not match:
             return None
 
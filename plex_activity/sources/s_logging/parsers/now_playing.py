@@ -1,5 +1,5 @@
-from plex_activity.core.helpers import str_format
-from plex_activity.sources.s_logging.parsers.base import Parser, LOG_PATTERN, REQUEST_HEADER_PATTERN
+from plex_activity.core.helpers import LazyRegex, str_format
+from plex_activity.sources.s_logging.parsers.base import Parser, MESSAGE_PATTERN, REQUEST_HEADER_PATTERN
 
 import logging
 import re
@@ -7,16 +7,27 @@ import re
 log = logging.getLogger(__name__)
 
 PLAYING_HEADER_PATTERN = str_format(REQUEST_HEADER_PATTERN, method="GET", path="/:/(?P<type>timeline|progress)/?(?:\?(?P<query>.*?))?\s")
-PLAYING_HEADER_REGEX = re.compile(PLAYING_HEADER_PATTERN, re.IGNORECASE)
+PLAYING_HEADER_REGEX = LazyRegex(PLAYING_HEADER_PATTERN, re.IGNORECASE)
 
-RANGE_REGEX = re.compile(str_format(LOG_PATTERN, message=r'Request range: \d+ to \d+'), re.IGNORECASE)
-CLIENT_REGEX = re.compile(str_format(LOG_PATTERN, message=r'Client \[(?P<machineIdentifier>.*?)\].*?'), re.IGNORECASE)
+RANGE_REGEX = LazyRegex(str_format(MESSAGE_PATTERN, message=r'Request range: \d+ to \d+'), re.IGNORECASE)
+CLIENT_REGEX = LazyRegex(str_format(MESSAGE_PATTERN, message=r'Client \[(?P<machineIdentifier>.*?)\].*?'), re.IGNORECASE)
 
-NOW_USER_REGEX = re.compile(str_format(LOG_PATTERN, message=r'\[Now\] User is (?P<user_name>.+) \(ID: (?P<user_id>\d+)\)'), re.IGNORECASE)
-NOW_CLIENT_REGEX = re.compile(str_format(LOG_PATTERN, message=r'\[Now\] Device is (?P<product>.+?) \((?P<client>.+)\)\.'), re.IGNORECASE)
+NOW_USER_REGEX = LazyRegex(str_format(MESSAGE_PATTERN, message=r'\[Now\] User is (?P<user_name>.+) \(ID: (?P<user_id>\d+)\)'), re.IGNORECASE)
+NOW_CLIENT_REGEX = LazyRegex(str_format(MESSAGE_PATTERN, message=r'\[Now\] Device is (?P<product>.+?) \((?P<client>.+)\)\.'), re.IGNORECASE)
+
+TIMELINE_REGEXES = [
+    CLIENT_REGEX,
+    RANGE_REGEX,
+
+    # [Now]* entries
+    NOW_USER_REGEX,
+    NOW_CLIENT_REGEX
+]
 
 
 class NowPlayingParser(Parser):
+    name = 'now_playing'
+
     required_info = [
         'ratingKey',
         'state', 'time'
@@ -33,42 +44,59 @@ class NowPlayingParser(Parser):
         'logging.playing'
     ]
 
-    def __init__(self, main):
-        super(NowPlayingParser, self).__init__(main)
+    tokenized = True
 
-        # Pipe events to the main logging activity instance
-        self.pipe(self.events, main)
+    keywords = [
+        '/:/timeline',
+        '/:/progress'
+    ]
 
     def process(self, line):
-        header_match = PLAYING_HEADER_REGEX.match(line)
+        header_match = PLAYING_HEADER_REGEX.match(line.message)
         if not header_match:
             return False
 
-        activity_type = header_match.group('type')
+        activity_type = header_match.group('type').lower()
 
-        # Get a match from the activity entries
+        # Start reading the activity entries
         if activity_type == 'timeline':
-            match = self.timeline()
+            self.open_block(line, header_match, activity_type, TIMELINE_REGEXES)
         elif activity_type == 'progress':
-            match = self.progress()
+            self.open_block(line, header_match, activity_type)
         else:
             log.warn('Unknown activity type "%s"', activity_type)
-            return True
 
-        if match is None:
-            match = {}
+        return True
+
+    def finish(self, block):
+        if not self.subscribed('logging.playing'):
+            return
+
+        header_match = block.header
+
+        # Get a match from the activity entries
+        if block.type == 'timeline':
+            match = self.timeline(block.info)
+        else:
+            match = self.progress(block.info)
 
         # Extend match with query info
         self.query(match, header_match.group('query'))
 
         # Ensure we successfully matched a result
         if not match:
-            return True
+            return
+
+        # Fall back to the client identifier in the request query (the websocket `clientIdentifier`)
+        if not match.get('machineIdentifier') and match.get('X-Plex-Client-Identifier'):
+            match['machineIdentifier'] = match['X-Plex-Client-Identifier']
 
         # Sanitize the activity result
         info = {
             'address': header_match.group('address'),
-            'port': header_match.group('port')
+            'port': header_match.group('port'),
+
+            'timestamp': block.line.timestamp
         }
 
         # - Get required info parameters
@@ -77,7 +105,7 @@ class NowPlayingParser(Parser):
                 info[key] = match[key]
             else:
                 log.info('Invalid activity match, missing key %s (matched keys: %s)', key, match.keys())
-                return True
+                return
 
         # - Add in any extra info parameters
         for key in self.extra_info:
@@ -88,21 +116,13 @@ class NowPlayingParser(Parser):
 
         # Update the scrobbler with the current state
         self.emit('logging.playing', info)
-        return True
-
-    def timeline(self):
-        return self.read_parameters(
-            lambda line: self.regex_match(CLIENT_REGEX, line),
-            lambda line: self.regex_match(RANGE_REGEX, line),
-
-            # [Now]* entries
-            lambda line: self.regex_match(NOW_USER_REGEX, line),
-            lambda line: self.regex_match(NOW_CLIENT_REGEX, line),
-        )
 
-    def progress(self):
-        data = self.read_parameters()
+    @staticmethod
+    def timeline(data):
+        return data
 
+    @staticmethod
+    def progress(data):
         if not data:
             return {}
 
@@ -1,26 +1,28 @@
-from plex_activity.core.helpers import str_format
-from plex_activity.sources.s_logging.parsers.base import Parser, LOG_PATTERN
+from plex_activity.core.helpers import LazyRegex, str_format
+from plex_activity.sources.s_logging.parsers.base import Parser, MESSAGE_PATTERN
 
 import re
 
 
 class ScrobbleParser(Parser):
-    pattern = str_format(LOG_PATTERN, message=r'Library item (?P<rating_key>\d+) \'(?P<title>.*?)\' got (?P<action>(?:un)?played) by account (?P<account_key>\d+)!.*?')
-    regex = re.compile(pattern, re.IGNORECASE)
+    name = 'scrobble'
+
+    pattern = str_format(MESSAGE_PATTERN, message=r'Library item (?P<rating_key>\d+) \'(?P<title>.*?)\' got (?P<action>(?:un)?played) by account (?P<account_key>\d+)!.*?')
+    regex = LazyRegex(pattern, re.IGNORECASE)
 
     events = [
         'logging.action.played',
         'logging.action.unplayed'
     ]
 
-    def __init__(self, main):
-        super(ScrobbleParser, self).__init__(main)
+    tokenized = True
 
-        # Pipe events to the main logging activity instance
-        self.pipe(self.events, main)
+    keywords = [
+        'Library item '
+    ]
 
     def process(self, line):
-        match = self.regex.match(line)
+        match = self.regex.match(line.message)
         if not match:
             return False
 
@@ -28,11 +30,18 @@ class ScrobbleParser(Parser):
         if not action:
             return False
 
-        self.emit('logging.action.%s' % action, {
+        event = 'logging.action.%s' % action
+
+        if not self.subscribed(event):
+            return True
+
+        self.emit(event, {
             'account_key': match.group('account_key'),
             'rating_key': match.group('rating_key'),
 
-            'title': match.group('title')
+            'title': match.group('title'),
+
+            'timestamp': line.timestamp
         })
 
         return True
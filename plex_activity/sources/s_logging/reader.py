@@ -0,0 +1,107 @@
+from collections import deque
+import logging
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class LogReader(object):
+    """Chunked line reader for "Plex Media Server.log"
+
+    Reads all available bytes from :code:`file` in chunks, splitting them into lines in bulk. Partial lines
+    (not yet terminated by a newline) are held back until the rest of the line has been written.
+    """
+
+    def __init__(self, file, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8', counter=None):
+        self.file = file
+
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+
+        self.lines = deque()
+        self.remainder = b''
+
+        # Total number of bytes read from the file
+        self.bytes_read = 0
+
+        # Metric incremented with the number of bytes read (optional)
+        self.counter = counter
+
+    def read_line(self):
+        while not self.lines:
+            if not self.fill():
+                return None
+
+        return self.lines.popleft()
+
+    def read_lines(self):
+        while not self.lines:
+            if not self.fill():
+                return []
+
+        lines = list(self.lines)
+        self.lines.clear()
+
+        return lines
+
+    def fill(self):
+        data = self.file.read(self.chunk_size)
+
+        if not data:
+            return 0
+
+        size = len(data)
+        self.bytes_read += size
+
+        if self.counter is not None:
+            self.counter.inc(size)
+
+        if self.remainder:
+            data = self.remainder + data
+
+        # Split chunk into lines, holding back any partial line
+        lines = data.split(b'\n')
+        self.remainder = lines.pop()
+
+        for line in lines:
+            self.lines.append(self.decode(line))
+
+        return size
+
+    def flush(self):
+        if not self.remainder:
+            return None
+
+        line = self.decode(self.remainder)
+        self.remainder = b''
+
+        return line
+
+    def decode(self, line):
+        if line.endswith(b'\r'):
+            line = line[:-1]
+
+        return line.decode(self.encoding, 'replace')
+
+    def close(self):
+        self.lines.clear()
+        self.remainder = b''
+
+        self.file = None
+
+
+def drain(reader):
+    """Read the rest of :code:`reader` in batches, including the trailing line (without a newline)"""
+    while True:
+        lines = reader.read_lines()
+
+        if not lines:
+            break
+
+        yield lines
+
+    line = reader.flush()
+
+    if line:
+        yield [line]
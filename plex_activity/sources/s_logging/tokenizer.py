@@ -0,0 +1,99 @@
+import time
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+
+class LogLine(object):
+    """Log line, split into the PMS header fields and message.
+
+    e.g. :code:`Nov 26, 2016 12:00:00.123 [0x7f1a2b3c4d5e] DEBUG - Request: ...`
+    """
+
+    __slots__ = ('time', 'thread', 'level', 'message', 'line', '_timestamp')
+
+    def __init__(self, time, thread, level, message, line=None):
+        self.time = time
+        self.thread = thread
+        self.level = level
+        self.message = message
+
+        # Raw line (passed to parsers that don't accept records)
+        self.line = line
+
+        self._timestamp = None
+
+    @property
+    def timestamp(self):
+        if self._timestamp is None:
+            self._timestamp = parse_time(self.time)
+
+        return self._timestamp
+
+    def __repr__(self):
+        return '<LogLine %s [%s] %s - %r>' % (self.time, self.thread, self.level, self.message)
+
+
+def tokenize(line):
+    start = line.find('[')
+
+    if start < 0:
+        return None
+
+    end = line.find('] ', start + 1)
+
+    if end < 0:
+        return None
+
+    separator = line.find(' - ', end + 2)
+
+    if separator < 0:
+        return None
+
+    return LogLine(
+        line[:start].rstrip(),
+        line[start + 1:end],
+        line[end + 2:separator],
+        line[separator + 3:],
+        line
+    )
+
+
+_time_cache = (None, None)
+
+
+def parse_time(value):
+    global _time_cache
+
+    if not value:
+        return None
+
+    # Split fractional seconds (PMS has written both "12:00:00.123" and "12:00:00:123")
+    seconds, fraction = value, 0.0
+
+    if len(value) > 4 and value[-4] in '.:' and value[-3:].isdigit():
+        seconds, fraction = value[:-4], int(value[-3:]) / 1000.0
+
+    # Parsing is expensive, re-use the result for lines written in the same second
+    cached_seconds, cached_result = _time_cache
+
+    if cached_seconds == seconds:
+        return cached_result + fraction
+
+    try:
+        month, day, year, clock = seconds.replace(',', '').split()
+        hour, minute, second = clock.split(':')
+
+        result = time.mktime((
+            int(year), MONTHS[month[:3].lower()], int(day),
+            int(hour), int(minute), int(second),
+            0, 0, -1
+        ))
+    except (KeyError, ValueError, OverflowError):
+        return None
+
+    _time_cache = (seconds, result)
+
+    return result + fraction
@@ -0,0 +1,191 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+log = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+FILE_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVE_SELF | IN_DELETE_SELF
+DIRECTORY_MASK = IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Watcher(object):
+    """Polling watcher, waits for the full timeout before returning."""
+
+    name = 'polling'
+
+    def __init__(self, path):
+        self.path = path
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return False
+
+    def close(self):
+        pass
+
+    @classmethod
+    def available(cls):
+        return True
+
+
+class InotifyWatcher(Watcher):
+    """Linux inotify watcher, wakes as soon as the log file (or its directory) changes."""
+
+    name = 'inotify'
+
+    libc = None
+
+    def __init__(self, path):
+        super(InotifyWatcher, self).__init__(path)
+
+        self.directory, self.filename = os.path.split(path)
+
+        self.fd = self._call(self.libc.inotify_init1, IN_NONBLOCK | IN_CLOEXEC)
+
+        try:
+            self.wd_file = self._add_watch(path, FILE_MASK)
+            self.wd_directory = self._add_watch(self.directory, DIRECTORY_MASK)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout):
+        if self.fd is None:
+            return super(InotifyWatcher, self).wait(timeout)
+
+        try:
+            r, _, _ = select.select([self.fd], [], [], timeout)
+        except (OSError, select.error) as ex:
+            if ex.args and ex.args[0] == errno.EINTR:
+                return False
+
+            raise
+
+        if not r:
+            return False
+
+        return self.read_events()
+
+    def close(self):
+        if self.fd is None:
+            return
+
+        try:
+            os.close(self.fd)
+        except OSError as ex:
+            log.debug('Unable to close inotify descriptor: %s', ex)
+        finally:
+            self.fd = None
+
+    def read_events(self):
+        changed = False
+
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as ex:
+                if ex.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+
+                raise
+
+            if not data:
+                break
+
+            offset = 0
+
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if self._process_event(wd, mask, name):
+                    changed = True
+
+        return changed
+
+    def _process_event(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost, assume everything changed
+            return True
+
+        if wd == self.wd_directory:
+            # Ignore changes to other files in the log directory
+            if name.decode(sys.getfilesystemencoding(), 'replace') != self.filename:
+                return False
+        elif wd != self.wd_file:
+            return False
+
+        return True
+
+    def _add_watch(self, path, mask):
+        if not isinstance(path, bytes):
+            path = path.encode(sys.getfilesystemencoding())
+
+        return self._call(self.libc.inotify_add_watch, self.fd, path, mask)
+
+    @staticmethod
+    def _call(func, *args):
+        result = func(*args)
+
+        if result < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+
+        return result
+
+    @classmethod
+    def available(cls):
+        if cls.libc is not None:
+            return cls.libc is not False
+
+        cls.libc = False
+
+        if not sys.platform.startswith('linux'):
+            return False
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        except (OSError, AttributeError) as ex:
+            log.debug('inotify is not available: %s', ex)
+            return False
+
+        cls.libc = libc
+        return True
+
+
+def create_watcher(path, inotify=True):
+    if inotify and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(path)
+        except OSError as ex:
+            log.info('Unable to watch "%s" with inotify, falling back to polling: %s', path, ex)
+
+    return Watcher(path)
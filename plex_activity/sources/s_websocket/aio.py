@@ -0,0 +1,186 @@
+from plex_activity.sources.aio import AsyncSource
+from plex_activity.sources.s_websocket.main import WebSocket
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import struct
+import websocket
+
+log = logging.getLogger(__name__)
+
+ACCEPT_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class AsyncWebSocket(AsyncSource, WebSocket):
+    """Non-blocking (asyncio) websocket source"""
+
+    def __init__(self, activity, server=None):
+        super(AsyncWebSocket, self).__init__(activity, server)
+
+        self.reader = None
+        self.writer = None
+
+        # Buffered fragments of the current message
+        self.fragments = None
+        self.fragments_opcode = None
+
+    async def connect(self):
+        self.close()
+
+        host, port = self.get_address()
+        path = self.get_path()
+
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+        # Send handshake
+        key = base64.b64encode(os.urandom(16))
+
+        request = (
+            'GET %s HTTP/1.1\r\n'
+            'Host: %s:%s\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            'Sec-WebSocket-Key: %s\r\n'
+            'Sec-WebSocket-Version: 13\r\n'
+            '\r\n'
+        ) % (path, host, port, key.decode('ascii'))
+
+        self.writer.write(request.encode('ascii'))
+
+        await self.writer.drain()
+
+        # Read handshake response
+        status = await self.reader.readline()
+
+        if status.split(b' ', 2)[1:2] != [b'101']:
+            raise websocket.WebSocketException('Handshake status %r' % status.strip())
+
+        headers = {}
+
+        while True:
+            line = await self.reader.readline()
+
+            if not line.strip():
+                break
+
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        expected = base64.b64encode(hashlib.sha1(key + ACCEPT_GUID).digest()).decode('ascii')
+
+        if headers.get('sec-websocket-accept') != expected:
+            raise websocket.WebSocketException('Invalid "Sec-WebSocket-Accept" header in handshake response')
+
+    async def run(self):
+        while True:
+            try:
+                if not self.writer:
+                    await asyncio.wait_for(self.connect(), self.connect_timeout)
+
+                    log.debug('Ready')
+                    self.ready.set_result(True)
+
+                self.process(*(await self.receive()))
+
+                # successfully received data, reset reconnects counter
+                self.reconnects = 0
+            except (websocket.WebSocketException, OSError, asyncio.TimeoutError) as ex:
+                self.close()
+                self.request_health_check()
+
+                if self.reconnects <= 5:
+                    self.reconnects += 1
+                    self.metric_reconnects.inc()
+
+                    # Increasing sleep interval between reconnections
+                    if self.reconnects > 1:
+                        await asyncio.sleep(2 * (self.reconnects - 1))
+
+                    log.info('WebSocket connection to %s has closed (%s), reconnecting...', self.get_address(), ex)
+                else:
+                    log.error('WebSocket connection unavailable, activity monitoring not available')
+                    break
+
+    async def receive(self):
+        try:
+            fin, opcode, data = await self.read_frame()
+        except (asyncio.IncompleteReadError, ConnectionError) as ex:
+            raise websocket.WebSocketConnectionClosedException(str(ex))
+
+        if opcode == websocket.ABNF.OPCODE_CONT:
+            if self.fragments is None:
+                log.debug('Received continuation frame without a message')
+                return None, None
+
+            self.fragments.append(data)
+
+            if not fin:
+                return None, None
+
+            opcode, data = self.fragments_opcode, b''.join(self.fragments)
+
+            self.fragments = None
+            self.fragments_opcode = None
+
+            return opcode, data
+        elif opcode in self.opcode_data:
+            if not fin:
+                self.fragments = [data]
+                self.fragments_opcode = opcode
+                return None, None
+
+            return opcode, data
+        elif opcode == websocket.ABNF.OPCODE_CLOSE:
+            self.send(data[:2], websocket.ABNF.OPCODE_CLOSE)
+            return opcode, None
+        elif opcode == websocket.ABNF.OPCODE_PING:
+            self.send(data, websocket.ABNF.OPCODE_PONG)
+
+        return None, None
+
+    async def read_frame(self):
+        header = await self.reader.readexactly(2)
+
+        fin = header[0] & 0x80
+        opcode = header[0] & 0x0f
+
+        masked = header[1] & 0x80
+        length = header[1] & 0x7f
+
+        if length == 126:
+            length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+
+        mask = None
+
+        if masked:
+            mask = await self.reader.readexactly(4)
+
+        data = await self.reader.readexactly(length)
+
+        if mask:
+            data = bytes(b ^ mask[x % 4] for x, b in enumerate(data))
+
+        return fin, opcode, data
+
+    def send(self, data, opcode):
+        if not self.writer:
+            return
+
+        self.writer.write(websocket.ABNF.create_frame(data, opcode).format())
+
+    def close(self):
+        if not self.writer:
+            return
+
+        try:
+            self.writer.close()
+        except Exception as ex:
+            log.debug('Unable to close connection: %s', ex)
+        finally:
+            self.reader = None
+            self.writer = None
@@ -1,8 +1,11 @@
 from plex import Plex
 from plex.lib.six.moves.urllib_parse import urlencode
+from plex_activity.core import decoder
+from plex_activity.core.helpers import LazyRegex, has_listeners, is_subscribed
+from plex_activity.core.metrics import get_registry
+from plex_activity.events import WEBSOCKET_EVENTS
 from plex_activity.sources.base import Source
 
-import json
 import logging
 import re
 import time
@@ -10,8 +13,8 @@ import websocket
 
 log = logging.getLogger(__name__)
 
-SCANNING_REGEX = re.compile('Scanning the "(?P<section>.*?)" section', re.IGNORECASE)
-SCAN_COMPLETE_REGEX = re.compile('Library scan complete', re.IGNORECASE)
+SCANNING_REGEX = LazyRegex('Scanning the "(?P<section>.*?)" section', re.IGNORECASE)
+SCAN_COMPLETE_REGEX = LazyRegex('Library scan complete', re.IGNORECASE)
 
 TIMELINE_STATES = {
     0: 'created',
@@ -26,51 +29,123 @@ TIMELINE_STATES = {
 
 class WebSocket(Source):
     name = 'websocket'
-    events = [
-        'websocket.playing',
-
-        'websocket.scanner.started',
-        'websocket.scanner.progress',
-        'websocket.scanner.finished',
-
-        'websocket.timeline.created',
-        'websocket.timeline.matching',
-        'websocket.timeline.downloading',
-        'websocket.timeline.loading',
-        'websocket.timeline.finished',
-        'websocket.timeline.analyzing',
-        'websocket.timeline.deleted'
-    ]
+    events = list(WEBSOCKET_EVENTS)
+
+    # Children container key for each message type (PMS 1.3.0+)
+    container_keys = {
+        'playing': 'PlaySessionStateNotification',
+        'progress': 'ProgressNotification',
+        'status': 'StatusNotification',
+        'timeline': 'TimelineEntry'
+    }
 
     opcode_data = (websocket.ABNF.OPCODE_TEXT, websocket.ABNF.OPCODE_BINARY)
 
-    def __init__(self, activity):
-        super(WebSocket, self).__init__()
+    # Seconds to wait for the connection (and handshake) to complete
+    connect_timeout = 10
+
+    def __init__(self, activity, server=None):
+        super(WebSocket, self).__init__(server)
+
+        self.activity = activity
 
         self.ws = None
         self.reconnects = 0
 
-        # Pipe events to the main activity instance
-        self.pipe(self.events, activity)
+        # Metrics
+        registry = get_registry(activity)
+        server_name = server.name if server is not None else ''
+
+        self.metric_frames = registry.counter(
+            'plex_activity_websocket_frames_total', 'Websocket data frames received', ['server']
+        ).labels(server_name)
+
+        self.metric_decoded = registry.counter(
+            'plex_activity_websocket_decoded_total', 'Websocket messages decoded', ['server']
+        ).labels(server_name)
+
+        self.metric_reconnects = registry.counter(
+            'plex_activity_websocket_reconnects_total', 'Websocket reconnections', ['server']
+        ).labels(server_name)
+
+        # Build message handlers (`process_<type>` methods)
+        self.handlers = dict([
+            (key[8:], getattr(self, key))
+            for key in dir(self.__class__)
+            if key.startswith('process_')
+        ])
+
+        # Build event names
+        self.event_playing = '%s.playing' % self.name
+
+        self.event_scanner_started = '%s.scanner.started' % self.name
+        self.event_scanner_progress = '%s.scanner.progress' % self.name
+        self.event_scanner_finished = '%s.scanner.finished' % self.name
+
+        self.event_timeline = dict([
+            (key, '%s.timeline.%s' % (self.name, state))
+            for key, state in TIMELINE_STATES.items()
+        ])
+
+        # Events emitted for each message type
+        self.message_events = {
+            'playing': [self.event_playing],
+            'progress': [self.event_scanner_progress],
+            'status': [self.event_scanner_started, self.event_scanner_finished],
+            'timeline': list(self.event_timeline.values())
+        }
+
+        # Raw notification event names and children container keys (by message type), built on demand
+        self.event_notifications = {}
+        self.children_keys = dict(self.container_keys)
+
+        # Subscription checks (by message type), reset when the activity subscriptions change
+        self.subscriptions = {}
+        self.subscriptions_version = None
+
+        # Forward events to the main activity instance
+        self.forward(self.events, activity)
 
     def connect(self):
-        uri = 'ws://%s:%s/:/websockets/notifications' % (
-            Plex.configuration.get('server.host', '127.0.0.1'),
-            Plex.configuration.get('server.port', 32400)
-        )
+        # Create websocket connection
+        self.ws = websocket.create_connection(self.get_uri(), timeout=self.connect_timeout)
+
+        # Only the connection is time-bounded, wait indefinitely for messages
+        self.ws.settimeout(None)
+
+        self.ready.set_result(True)
+
+    def get_path(self):
+        path = '/:/websockets/notifications'
 
         params = {}
 
+        if self.server is not None:
+            token = self.server.token
+        else:
+            token = Plex.configuration['authentication.token']
+
         # Set authentication token (if one is available)
-        if Plex.configuration['authentication.token']:
-            params['X-Plex-Token'] = Plex.configuration['authentication.token']
+        if token:
+            params['X-Plex-Token'] = token
 
-        # Append parameters to uri
+        # Append parameters to path
         if params:
-            uri += '?' + urlencode(params)
+            path += '?' + urlencode(params)
 
-        # Create websocket connection
-        self.ws = websocket.create_connection(uri)
+        return path
+
+    def get_address(self):
+        if self.server is not None:
+            return self.server.host, self.server.port
+
+        return (
+            Plex.configuration.get('server.host', '127.0.0.1'),
+            Plex.configuration.get('server.port', 32400)
+        )
+
+    def get_uri(self):
+        return 'ws://%s:%s%s' % (self.get_address() + (self.get_path(),))
 
     def run(self):
         self.connect()
@@ -84,8 +159,11 @@ class WebSocket(Source):
                 # successfully received data, reset reconnects counter
                 self.reconnects = 0
             except websocket.WebSocketConnectionClosedException:
+                self.request_health_check()
+
                 if self.reconnects <= 5:
                     self.reconnects += 1
+                    self.metric_reconnects.inc()
 
                     # Increasing sleep interval between reconnections
                     if self.reconnects > 1:
@@ -116,8 +194,17 @@ class WebSocket(Source):
         if opcode not in self.opcode_data:
             return False
 
+        self.metric_frames.inc()
+        self.received = time.time()
+
+        # Skip decoding messages nobody is listening for
+        m_type = decoder.peek_type(data)
+
+        if m_type is not None and not self.is_message_subscribed(m_type):
+            return False
+
         try:
-            info = json.loads(data)
+            info = decoder.loads(data)
         except UnicodeDecodeError as ex:
             log.warn('Error decoding message from websocket: %s' % ex, extra={
                 'event': {
@@ -133,12 +220,14 @@ class WebSocket(Source):
                 'event': {
                     'module': __name__,
                     'name': 'process.load_exception',
-                    'key': ex.message
+                    'key': str(ex)
                 }
             })
             log.debug(data)
             return False
 
+        self.metric_decoded.inc()
+
         # Handle modern messages (PMS 1.3.0+)
         if type(info.get('NotificationContainer')) is dict:
             info = info['NotificationContainer']
@@ -150,14 +239,17 @@ class WebSocket(Source):
             log.debug('Received message with no "type" parameter: %r', info)
             return False
 
+        if not self.is_message_subscribed(m_type):
+            return False
+
         # Pre-process message (if function exists)
-        process_func = getattr(self, 'process_%s' % m_type, None)
+        process_func = self.handlers.get(m_type)
 
         if process_func and process_func(info):
             return True
 
         # Emit raw message
-        return self.emit_notification('%s.notification.%s' % (self.name, m_type), info)
+        return self.emit_notification(self.get_notification_event(m_type), info, m_type)
 
     def process_playing(self, info):
         children = info.get('_children') or info.get('PlaySessionStateNotification')
@@ -166,7 +258,7 @@ class WebSocket(Source):
             log.debug('Received "playing" message with no children: %r', info)
             return False
 
-        return self.emit_notification('%s.playing' % self.name, children)
+        return self.emit_notification(self.event_playing, children)
 
     def process_progress(self, info):
         children = info.get('_children') or info.get('ProgressNotification')
@@ -175,8 +267,11 @@ class WebSocket(Source):
             log.debug('Received "progress" message with no children: %r', info)
             return False
 
+        if not self.subscribed(self.event_scanner_progress):
+            return True
+
         for notification in children:
-            self.emit('%s.scanner.progress' % self.name, {
+            self.emit(self.event_scanner_progress, {
                 'message': notification.get('message')
             })
 
@@ -200,7 +295,9 @@ class WebSocket(Source):
 
             # Scan complete message
             if SCAN_COMPLETE_REGEX.match(title):
-                self.emit('%s.scanner.finished' % self.name)
+                if self.subscribed(self.event_scanner_finished):
+                    self.emit(self.event_scanner_finished)
+
                 count += 1
                 continue
 
@@ -215,7 +312,9 @@ class WebSocket(Source):
             if not section:
                 continue
 
-            self.emit('%s.scanner.started' % self.name, {'section': section})
+            if self.subscribed(self.event_scanner_started):
+                self.emit(self.event_scanner_started, {'section': section})
+
             count += 1
 
         # Validate result
@@ -236,12 +335,14 @@ class WebSocket(Source):
         count = 0
 
         for entry in children:
-            state = TIMELINE_STATES.get(entry.get('state'))
+            event = self.event_timeline.get(entry.get('state'))
 
-            if not state:
+            if not event:
                 continue
 
-            self.emit('%s.timeline.%s' % (self.name, state), entry)
+            if self.subscribed(event):
+                self.emit(event, entry)
+
             count += 1
 
         # Validate result
@@ -255,12 +356,43 @@ class WebSocket(Source):
     # Helpers
     #
 
-    def emit_notification(self, name, info=None):
+    def is_message_subscribed(self, m_type):
+        version = getattr(self.activity, 'subscriptions_version', None)
+
+        if version is None or version != self.subscriptions_version:
+            self.subscriptions = {}
+            self.subscriptions_version = version
+
+        subscribed = self.subscriptions.get(m_type)
+
+        if subscribed is None:
+            events = self.message_events.get(m_type)
+
+            subscribed = self.subscriptions[m_type] = bool(events) and is_subscribed(self.activity, *events)
+
+        if subscribed:
+            return True
+
+        # Raw notifications are emitted on the source
+        return has_listeners(self, self.get_notification_event(m_type))
+
+    def get_notification_event(self, m_type):
+        event = self.event_notifications.get(m_type)
+
+        if event is None:
+            event = self.event_notifications[m_type] = '%s.notification.%s' % (self.name, m_type)
+
+        return event
+
+    def emit_notification(self, name, info=None, m_type=None):
         if info is None:
             info = {}
 
         # Emit children
-        children = self._get_children(info)
+        if m_type is not None and type(info) is dict:
+            children = self.get_children(info, m_type)
+        else:
+            children = self._get_children(info)
 
         if children:
             for child in children:
@@ -276,6 +408,31 @@ class WebSocket(Source):
 
         return True
 
+    def get_children(self, info, m_type):
+        if info.get('_children'):
+            return info['_children']
+
+        key = self.children_keys.get(m_type)
+
+        if key is not None:
+            value = info.get(key)
+
+            if type(value) is list:
+                return value
+
+        # Search for modern children container
+        for key, value in info.items():
+            if type(value) is not list:
+                continue
+
+            name = key.lower()
+
+            if name.endswith('entry') or name.endswith('notification'):
+                self.children_keys[m_type] = key
+                return value
+
+        return None
+
     @staticmethod
     def _get_children(info):
         if type(info) is list:
@@ -0,0 +1,108 @@
+from plex_activity.core.ready import Ready
+from plex_activity.sources.s_websocket.aio import AsyncWebSocket
+
+from threading import Thread
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class WebSocketGroup(object):
+    """Websocket connections to multiple servers, running on the current event loop"""
+
+    name = 'websocket'
+
+    def __init__(self, activity, servers):
+        self.activity = activity
+        self.servers = servers
+
+        self.connections = []
+
+        # Readiness of each connection, keyed by server name
+        self.server_ready = {}
+
+        # Resolved as soon as any connection is ready (unavailable once every connection has failed)
+        self.ready = Ready(self.name)
+
+    def start(self):
+        self.start_connections()
+
+    async def stop(self):
+        await self.stop_connections()
+
+    def start_connections(self):
+        for server in self.servers:
+            connection = AsyncWebSocket(self.activity, server)
+            connection.start()
+
+            self.connections.append(connection)
+            self.server_ready[server.name] = connection.ready
+
+        log.info('Started %d websocket connection(s)', len(self.connections))
+
+        for connection in self.connections:
+            connection.ready.add_done_callback(self._resolved)
+
+        if not self.connections:
+            self.ready.set_result(False)
+
+    async def stop_connections(self):
+        for connection in self.connections:
+            await connection.stop()
+
+        self.connections = []
+
+    def _resolved(self, ready):
+        if ready.exception() is None and ready.result():
+            self.ready.set_result(True)
+            return
+
+        if all([connection.ready.done() for connection in self.connections]):
+            self.ready.set_result(False)
+
+
+class WebSocketMultiplexer(WebSocketGroup):
+    """Runs websocket connections to multiple servers on a single event loop (and thread)"""
+
+    def __init__(self, activity, servers):
+        super(WebSocketMultiplexer, self).__init__(activity, servers)
+
+        self.loop = None
+        self.thread = Thread(target=self._run_wrapper, name='activity-websocket-multiplexer')
+
+        # Started on a (daemon) start thread, keep the process alive while connections are running
+        self.thread.daemon = False
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        if not self.loop:
+            return
+
+        future = asyncio.run_coroutine_threadsafe(self.stop_connections(), self.loop)
+        future.result()
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            self.loop.run_until_complete(self._start())
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def _start(self):
+        self.start_connections()
+
+    def _run_wrapper(self):
+        try:
+            self.run()
+        except Exception as ex:
+            log.error('Exception raised in "%s" activity source: %s', self.name, ex, exc_info=True)
+            self.ready.set_exception(ex)